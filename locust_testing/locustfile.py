@@ -1 +1,2 @@
 from tests.test_category import GetCategory
+from tests.test_login_storm import CatalogReader, LoginStorm
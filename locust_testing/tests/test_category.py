@@ -55,7 +55,9 @@ class GetCategory(FastHttpUser):
         assert response.status_code == http.HTTPStatus.OK
         response_json = response.json()
         assert isinstance(response_json["items"], list)
-        assert {"items", "total", "page", "limit", "pages"} == set(response_json.keys())
+        assert {"items", "total", "page", "limit", "pages", "has_next", "next_cursor", "prev_cursor"} == set(
+            response_json.keys()
+        )
 
     @task
     def category_flow_e2e(self):
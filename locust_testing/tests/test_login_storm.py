@@ -0,0 +1,44 @@
+"""
+Login storm: bcrypt must not block other requests of the worker.
+
+LoginStorm only logs in, CatalogReader reads endpoints without passwords.
+Compare "POST /api/auth/login" RPS and 99%ile of CatalogReader requests with and without LoginStorm users:
+    locust -f locustfile.py --class-picker
+Backend metrics: password_hash_queue_depth, password_hash_wait_seconds on /metrics.
+"""
+
+import http
+
+from locust import between, task
+from locust.contrib.fasthttp import FastHttpUser
+
+from constants import UserAuth
+
+
+class LoginStorm(FastHttpUser):
+    wait_time = between(0, 0.1)
+
+    @task
+    def login(self):
+        data = {
+            "grant_type": "password",
+            "username": UserAuth.USER_EMAIL,
+            "password": UserAuth.USER_PASSWORD,
+        }
+        with self.client.post("/api/auth/login", data=data, catch_response=True) as response:
+            if response.status_code != http.HTTPStatus.OK:
+                response.failure(f"login failed: {response.status_code}")
+
+
+class CatalogReader(FastHttpUser):
+    wait_time = between(0.5, 1)
+
+    @task(3)
+    def get_products(self):
+        response = self.client.get("/api/products/?limit=8")
+        assert response.status_code == http.HTTPStatus.OK
+
+    @task
+    def get_categories(self):
+        response = self.client.get("/api/categories/")
+        assert response.status_code == http.HTTPStatus.OK
@@ -24,7 +24,7 @@ class AdminAuth(AuthenticationBackend):
         if not user or not user.is_admin:
             return False
 
-        if not PasswordEncrypt.verify_password(password, user.hashed_password):
+        if not await PasswordEncrypt.verify_password(password, user.hashed_password):
             return False
 
         session_token = await PasswordEncrypt.get_password_hash(user_email)
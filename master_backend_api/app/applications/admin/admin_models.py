@@ -2,10 +2,13 @@ from typing import TYPE_CHECKING
 
 from sqladmin import ModelView
 
+from applications.products.cache import CatalogEntityEnum, catalog_cache
 from applications.products.models import Category, Product
+from applications.users.cache import user_cache
 from applications.users.models import User
-from applications.products.crud import category_manager
-from dependencies.database import get_async_session
+from applications.products.crud import category_manager, product_manager
+from applications.users.crud import user_manager
+from applications.base_model_and_mixins.base_models import async_session_maker
 from applications.base_schemas import InstanceVersion
 from starlette.requests import Request
 
@@ -20,7 +23,7 @@ class UserAdmin(ModelView, model=User):
     column_default_sort = [(User.email, True), (User.name, False)]
     column_searchable_list = [User.name, User.email]
     column_sortable_list = [User.id]
-    form_excluded_columns = [User.hashed_password]
+    form_excluded_columns = [User.hashed_password, User.search_vector]
     page_size = 50
     page_size_options = [25, 50, 100, 200]
     can_create = False
@@ -28,15 +31,25 @@ class UserAdmin(ModelView, model=User):
     can_delete = False
     can_view_details = True
 
+    async def after_model_change(self, data: dict, model: User, is_created: bool, request: Request) -> None:
+        await user_cache.invalidate(model.id)
+        await user_manager.invalidate_listings()
+
 
 class OptimisticOfflineLockValidator:
     @classmethod
-    async def check_version(cls, model: "Base", provided_version: int) -> None:
-        """if concurrency occurs - will raise hard error (in sentry), but let it be"""
-        session_gen = get_async_session()
-        session = await anext(session_gen)
-        data_to_patch = InstanceVersion(version=provided_version)
-        await category_manager.patch_item(instance_id=model.id, session=session, data_to_patch=data_to_patch)
+    async def check_version(cls, data: dict, model: "Base") -> None:
+        """
+        if concurrency occurs - will raise hard error (in sentry), but let it be
+        check and version increment are done by one UPDATE ... WHERE version = :version RETURNING
+        """
+        async with async_session_maker() as session:
+            data_to_patch = InstanceVersion(version=data["version"])
+            updated = await category_manager.patch_item(
+                instance_id=model.id, session=session, data_to_patch=data_to_patch
+            )
+        # sqladmin writes form data into the model after this hook and commits it - it must not roll the version back
+        data["version"] = updated.version
 
 
 class CategoryAdmin(ModelView, model=Category):
@@ -49,7 +62,15 @@ class CategoryAdmin(ModelView, model=Category):
     icon = "fa-solid fa-chart-line"
 
     async def on_model_change(self, data: dict, model: "Base", is_created: bool, request: Request) -> None:
-        await OptimisticOfflineLockValidator.check_version(model=model, provided_version=data["version"])
+        await OptimisticOfflineLockValidator.check_version(data=data, model=model)
+
+    async def after_model_change(self, data: dict, model: Category, is_created: bool, request: Request) -> None:
+        await catalog_cache.invalidate(CatalogEntityEnum.CATEGORY, model.id)
+        await category_manager.invalidate_listings()
+
+    async def after_model_delete(self, model: Category, request: Request) -> None:
+        await catalog_cache.invalidate(CatalogEntityEnum.CATEGORY, model.id)
+        await category_manager.invalidate_listings()
 
 
 class ProductAdmin(ModelView, model=Product):
@@ -68,3 +89,11 @@ class ProductAdmin(ModelView, model=Product):
     form_columns = ["title", "price", "category", "description"]
     category = "products"
     icon = "fa-solid fa-box"
+
+    async def after_model_change(self, data: dict, model: Product, is_created: bool, request: Request) -> None:
+        await catalog_cache.invalidate(CatalogEntityEnum.PRODUCT, model.id)
+        await product_manager.invalidate_listings()
+
+    async def after_model_delete(self, model: Product, request: Request) -> None:
+        await catalog_cache.invalidate(CatalogEntityEnum.PRODUCT, model.id)
+        await product_manager.invalidate_listings()
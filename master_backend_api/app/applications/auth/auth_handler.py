@@ -4,12 +4,15 @@ from datetime import datetime, timedelta
 import jwt
 from fastapi import HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from applications.auth.password_handler import PasswordEncrypt
-from applications.auth.schemas import LoginResponse
+from applications.auth.schemas import LoginResponse, RefreshTokenClaims
+from applications.users.cache import user_cache
 from applications.users.crud import user_manager
 from applications.users.models import User
+from applications.users.schemas import UserSnapshot
 from services.redis_service import redis_service
 from settings import settings
 
@@ -63,7 +66,7 @@ class AuthHandler:
         except jwt.InvalidTokenError as e:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
 
-    async def generate_token_pair(self, user: User) -> LoginResponse:
+    async def generate_token_pair(self, user: User | UserSnapshot) -> LoginResponse:
         access_token_payload = {
             "sub": str(user.id),
             "email": user.email,
@@ -78,9 +81,10 @@ class AuthHandler:
         }
         refresh_token_expires = timedelta(minutes=settings.REFRESH_TOKEN_TIME_MINUTES)
         refresh_token = await self.generate_token(refresh_token_payload, refresh_token_expires)
+        claims = RefreshTokenClaims(user_id=user.id, email=user.email, use_token_since=user.use_token_since)
         await redis_service.set_cache(
             key=refresh_token_payload["key"],
-            value=user.id,
+            value=claims.model_dump_json(),
             ttl=refresh_token_expires.total_seconds(),
         )
 
@@ -94,17 +98,30 @@ class AuthHandler:
         payload = await self.decode_token(refresh_token)
 
         refresh_token_key = payload.get("key")
-        stored_refresh = await redis_service.get_cache(refresh_token_key)
-        if not stored_refresh:
+        if not refresh_token_key:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
+
+        # GETDEL - token can be used only once even by concurrent requests
+        stored_claims = await redis_service.consume_cache(refresh_token_key)
+        if not stored_claims:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token was used already")
 
-        await redis_service.delete_cache(refresh_token_key)
-        user: User = await user_manager.get_item(field=User.id, field_value=int(payload["sub"]), session=session)
+        try:
+            claims = RefreshTokenClaims.model_validate_json(stored_claims)
+        except ValidationError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
+        if claims.user_id != int(payload["sub"]):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
 
+        # snapshot is dropped on every user change, so DB is queried only on cache miss
+        user = await user_cache.get(claims.user_id)
         if not user:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
+            db_user = await user_manager.get_item(field=User.id, field_value=claims.user_id, session=session)
+            if not db_user:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
+            user = await user_cache.set(db_user)
 
-        if user.use_token_since > payload["iat"]:
+        if user.use_token_since != claims.use_token_since:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User forced logout")
 
         token_pair = await self.generate_token_pair(user)
@@ -1,13 +1,70 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
 from passlib.context import CryptContext
+from prometheus_client import Gauge, Histogram
+
+from settings import settings
+
+T = TypeVar("T")
+
+password_hash_queue_depth = Gauge("password_hash_queue_depth", "bcrypt tasks waiting for a free worker")
+password_hash_in_progress = Gauge("password_hash_in_progress", "bcrypt tasks being executed now")
+password_hash_wait_seconds = Histogram(
+    "password_hash_wait_seconds",
+    "Time bcrypt task spent in the queue",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
 
 
 class PasswordEncrypt:
+    """
+    bcrypt takes ~100-300 ms of CPU, so it is executed in a bounded thread pool and not on the event loop.
+    bcrypt releases the GIL while hashing, threads are enough here.
+    """
+
     pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+    @classmethod
+    async def _run(cls, func: Callable[..., T], *args) -> T:
+        queued_at = time.perf_counter()
+        password_hash_queue_depth.inc()
+        is_dequeued = False
+        lock = threading.Lock()
+
+        def leave_queue() -> None:
+            # by the worker thread or by the caller if the task was cancelled before it started, only once
+            nonlocal is_dequeued
+            with lock:
+                if is_dequeued:
+                    return
+                is_dequeued = True
+            password_hash_queue_depth.dec()
+
+        def task() -> T:
+            leave_queue()
+            password_hash_wait_seconds.observe(time.perf_counter() - queued_at)
+            with password_hash_in_progress.track_inprogress():
+                return func(*args)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(cls.executor, task)
+        finally:
+            # cancelled await or shutdown(cancel_futures=True) - task is never executed
+            leave_queue()
 
     @classmethod
     async def get_password_hash(cls, password: str) -> str:
-        return cls.pwd_context.hash(password)
+        return await cls._run(cls.pwd_context.hash, password)
 
     @classmethod
     async def verify_password(cls, plain_password: str, hashed_password: str) -> bool:
-        return cls.pwd_context.verify(plain_password, hashed_password)
+        return await cls._run(cls.pwd_context.verify, plain_password, hashed_password)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        cls.executor.shutdown(wait=False, cancel_futures=True)
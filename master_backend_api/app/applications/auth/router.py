@@ -7,12 +7,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from applications.auth.auth_handler import auth_handler
 from applications.auth.schemas import EmailRequest, LoginResponse, ResetRequest, ForceLogout, UserRecoveryPassword
 from applications.base_schemas import StatusSuccess
+from applications.outbox.crud import outbox_manager
+from applications.outbox.relay import outbox_relay
 from applications.users.crud import user_manager
 from applications.users.models import User
 from dependencies.database import get_async_session
 from dependencies.security import get_current_user
 from services.rabbit.constants import SupportedQueues
-from services.rabbit.rabbitmq_service import rabbitmq_producer
 from services.redis_service import redis_service
 
 router_auth = APIRouter()
@@ -68,17 +69,21 @@ async def forgot_password(request: Request, data: EmailRequest, session: AsyncSe
 
     token = uuid.uuid4().hex
     await redis_service.set_cache(f"user:{token}:forgot_password_token", value=user.id, ttl=5 * 60)
-    await rabbitmq_producer.send_message(
-        UserRecoveryPassword(
-            user_name=user.name,
-            lang="uk",
-            email=user.email,
-            base_url=str(request.base_url),
-            redirect_url=f"{str(request.base_url)}docs#/Auth/reset_password_auth_reset_password__user_recovery_password_token__post",
-            token=token,
-        ).dict(),
-        queue_name=SupportedQueues.USER_RECOVERY_PASSWORD,
+    recovery_message = UserRecoveryPassword(
+        user_name=user.name,
+        lang="uk",
+        email=user.email,
+        base_url=str(request.base_url),
+        redirect_url=(
+            f"{str(request.base_url)}docs#/Auth/reset_password_auth_reset_password__user_recovery_password_token__post"
+        ),
+        token=token,
     )
+    outbox_manager.add_message(
+        session, queue_name=SupportedQueues.USER_RECOVERY_PASSWORD, payload=recovery_message.model_dump(mode="json")
+    )
+    await session.commit()
+    outbox_relay.wake_up()
     return {"temp_password_send": data.email}
 
 
@@ -86,7 +91,8 @@ async def forgot_password(request: Request, data: EmailRequest, session: AsyncSe
 async def reset_password(
     user_recovery_password_token: str, data: ResetRequest, session: AsyncSession = Depends(get_async_session)
 ):
-    user_id = await redis_service.get_cache(f"user:{user_recovery_password_token}:forgot_password_token")
+    # token is single-use: it is consumed even if the checks below fail
+    user_id = await redis_service.consume_cache(f"user:{user_recovery_password_token}:forgot_password_token")
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -106,7 +112,5 @@ async def reset_password(
             detail="Your account has been deactivated. Please contact support.",
         )
 
-    await redis_service.delete_cache(f"user:{user_recovery_password_token}:forgot_password_token")
-
     await user_manager.change_user_password(user_id=user.id, new_password=data.password, session=session)
     return {"password updated": True}
@@ -18,6 +18,14 @@ class ResetRequest(BaseModel):
     password: str
 
 
+class RefreshTokenClaims(BaseModel):
+    """stored in Redis next to refresh token key, enough to issue a new pair without users SELECT"""
+
+    user_id: int
+    email: str
+    use_token_since: datetime
+
+
 class ForceLogout(BaseModel):
     use_token_since: datetime = Field(default_factory=datetime.now)
 
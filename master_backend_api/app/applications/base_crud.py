@@ -1,17 +1,49 @@
+import re
 from abc import ABC, abstractmethod
 from math import ceil
 from typing import Any, Optional
 
 from fastapi import HTTPException, status
 from pydantic import BaseModel
-from sqlalchemy import asc, delete, desc, func, or_, select, update, exists, and_
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    and_,
+    any_,
+    asc,
+    delete,
+    desc,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import ColumnProperty, InstrumentedAttribute
 
-from applications.base_model_and_mixins.base_models import Base
-from applications.base_queries import SearchParams, SortEnum
+from applications.base_model_and_mixins.base_models import Base, async_session_maker
+from applications.base_queries import (
+    CursorDirectionEnum,
+    PaginationCursor,
+    PaginationModeEnum,
+    SearchEngineEnum,
+    SearchParams,
+    SortEnum,
+    TotalModeEnum,
+)
 from applications.base_schemas import PaginationResponse
+from services.listing_cache import listing_cache
+from services.redis_service import redis_service
+from services.single_flight import get_single_flight
+from utils.fast_json import dump_page, get_schema_attributes
 
 
 class BaseCRUD(ABC):
@@ -29,13 +61,14 @@ class BaseCRUD(ABC):
         try:
             await session.commit()
             await session.refresh(instance)
-            return instance
         except Exception as e:
             await session.rollback()
             raise HTTPException(
                 detail=f"Error has occurred while creating {self.model} with{kwargs=}, {e=}",
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+        await self.invalidate_listings()
+        return instance
 
     async def get_item(
         self,
@@ -55,45 +88,280 @@ class BaseCRUD(ABC):
         params: SearchParams,
         targeted_schema: type[BaseModel],
         search_fields: list[InstrumentedAttribute] = None,
+        cache_ttl: int | None = None,
     ) -> PaginationResponse:
+        """cache_ttl - see get_items_paginated_json"""
+        if cache_ttl:
+            page_json = await self.get_items_paginated_json(
+                session=session,
+                params=params,
+                targeted_schema=targeted_schema,
+                search_fields=search_fields,
+                cache_ttl=cache_ttl,
+            )
+            return PaginationResponse.model_validate_json(page_json)
+
+        items, page_info = await self._get_page(
+            session=session, params=params, targeted_schema=targeted_schema, search_fields=search_fields
+        )
+        return PaginationResponse(items=[targeted_schema.from_orm(item) for item in items], **page_info)
+
+    def _get_projection(self, targeted_schema: type[BaseModel], params: SearchParams) -> list[ColumnElement] | None:
+        """
+        Only columns read by targeted_schema (+ id and sort field for cursors), labeled by ORM attribute names,
+        so rows are mapped to the schema as they are - no ORM objects, identity map and unused columns.
+        None - schema reads something that is not a column (property, relationship), full entities are loaded.
+        """
+        attributes = [attribute for _, attribute in get_schema_attributes(targeted_schema)]
+        attributes += ["id", params.sort_by]
+        columns = {}
+        for attribute in attributes:
+            model_attribute = getattr(self.model, attribute, None)
+            if not isinstance(model_attribute, InstrumentedAttribute):
+                if attribute == params.sort_by:
+                    # unknown sort_by is replaced with id, see _get_page
+                    continue
+                return None
+            if not isinstance(model_attribute.property, ColumnProperty):
+                return None
+            columns[attribute] = model_attribute.label(attribute)
+        return list(columns.values())
+
+    async def _get_page(
+        self,
+        *,
+        session: AsyncSession,
+        params: SearchParams,
+        targeted_schema: type[BaseModel],
+        search_fields: list[InstrumentedAttribute] = None,
+    ) -> tuple[list[Base | Row], dict]:
+        """Items of the page (rows of _get_projection or ORM objects) and the rest of PaginationResponse fields"""
         order_direction = asc if params.order_direction == SortEnum.ASC else desc
-        query = select(self.model)
+        projection = self._get_projection(targeted_schema, params)
+        query = select(*projection) if projection else select(self.model)
         count_query = select(func.count()).select_from(self.model)
 
-        if params.q and search_fields:
-            if params.use_sharp_filter:
-                clean_query = params.q.strip().lower()
-                search_filter_condition = [func.lower(search_field) == clean_query for search_field in search_fields]
-            else:
-                # майже повнотекстовий пошук по частковому співпадіюю слів, введених не по порядку
-                # наприклад, для "Ноутбук Lenovo IdeaPad Slim 5 16IRL8" валідним буде запит "Ноутбук IdeaPad"
-                words = [word for word in params.q.strip().split() if len(word) > 1]
-                search_filter_condition = or_(
-                    and_(*(search_field.icontains(word) for word in words)) for search_field in search_fields
-                )
-
+        search_filter_condition, search_rank = self._get_search_filter(params, search_fields)
+        if search_filter_condition is not None:
             query = query.filter(search_filter_condition)
             count_query = count_query.filter(search_filter_condition)
 
         sort_field = getattr(self.model, params.sort_by, self.model.id)
 
-        query = query.order_by(order_direction(sort_field))
+        next_cursor = prev_cursor = total_count = None
+        if params.pagination_mode == PaginationModeEnum.CURSOR:
+            items, next_cursor, prev_cursor = await self._get_items_by_cursor(
+                query, params=params, sort_field=sort_field, is_projection=bool(projection), session=session
+            )
+            has_next = next_cursor is not None
+        else:
+            if search_rank is not None:
+                query = query.order_by(desc(search_rank))
+            query = query.order_by(order_direction(sort_field))
 
-        offset = (params.page - 1) * params.limit
-        query = query.offset(offset).limit(params.limit)
+            offset = (params.page - 1) * params.limit
+            # one extra row shows if the next page exists, so has_next does not need total
+            query = query.offset(offset).limit(params.limit + 1)
 
-        result = await session.execute(query)
+            if params.with_total and params.total_mode == TotalModeEnum.WINDOW:
+                # total is calculated before LIMIT/OFFSET, so there is no second round trip for COUNT(*)
+                query = query.add_columns(func.count().over().label("total_count"))
+                rows = (await session.execute(query)).all()
+                # extra total_count attribute of projected rows is not read by the schema
+                items = rows if projection else [row[0] for row in rows]
+                if rows:
+                    total_count = rows[0].total_count
+                elif offset == 0:
+                    total_count = 0
+            else:
+                result = await session.execute(query)
+                items = result.all() if projection else result.scalars().all()
+
+            has_next = len(items) > params.limit
+            items = items[: params.limit]
 
-        result_count = await session.execute(count_query)
-        total_count = result_count.scalar()
+        if params.with_total and total_count is None:
+            if params.total_mode == TotalModeEnum.ESTIMATED and not (params.q and search_fields):
+                total_count = await self.get_estimated_count(session=session)
+            if total_count is None:
+                result_count = await session.execute(count_query)
+                total_count = result_count.scalar()
 
-        return PaginationResponse(
-            items=[targeted_schema.from_orm(item) for item in result.scalars().all()],
+        page_info = dict(
             total=total_count,
             page=params.page,
             limit=params.limit,
-            pages=ceil(total_count / params.limit),
+            pages=ceil(total_count / params.limit) if total_count is not None else None,
+            has_next=has_next,
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
         )
+        return items, page_info
+
+    def _get_search_filter(
+        self, params: SearchParams, search_fields: list[InstrumentedAttribute] | None
+    ) -> tuple[ColumnElement[bool] | None, ColumnElement[float] | None]:
+        """WHERE condition of params.q (None - no search) and rank for ordering (fulltext search only)"""
+        if not (params.q and search_fields):
+            return None, None
+        if params.use_sharp_filter:
+            clean_query = params.q.strip().lower()
+            return or_(*(func.lower(search_field) == clean_query for search_field in search_fields)), None
+        if params.search_engine == SearchEngineEnum.FULLTEXT and hasattr(self.model, "search_vector"):
+            return self._get_fulltext_search(params.q, search_fields)
+        # майже повнотекстовий пошук по частковому співпадіюю слів, введених не по порядку
+        # наприклад, для "Ноутбук Lenovo IdeaPad Slim 5 16IRL8" валідним буде запит "Ноутбук IdeaPad"
+        words = [word for word in params.q.strip().split() if len(word) > 1]
+        condition = or_(and_(*(search_field.icontains(word) for word in words)) for search_field in search_fields)
+        return condition, None
+
+    async def get_items_paginated_json(
+        self,
+        *,
+        session: AsyncSession,
+        params: SearchParams,
+        targeted_schema: type[BaseModel],
+        search_fields: list[InstrumentedAttribute] = None,
+        cache_ttl: int | None = None,
+    ) -> str | bytes:
+        """
+        Page as ready response JSON (by_alias, as response_model gives it) - router returns it without
+        re-validation by response_model and stdlib json.dumps, see utils/responses.py.
+        Rows are dumped by orjson without pydantic models when targeted_schema allows it, see utils/fast_json.py.
+
+        cache_ttl - the JSON is cached in Redis for ttl seconds and returned without queries and parsing,
+        create_instance/patch_item/delete_item of the model make cached pages unreachable.
+        Concurrent misses of the same page share one query (single flight), it uses its own session.
+        """
+        page_key = None
+        if cache_ttl:
+            fingerprint = listing_cache.fingerprint(params, search_fields, targeted_schema)
+            page_key, cached_page = await listing_cache.get(self.model.__tablename__, fingerprint)
+            if cached_page is not None:
+                return cached_page
+
+        if page_key is None:
+            # not cached or Redis is not available
+            items, page_info = await self._get_page(
+                session=session, params=params, targeted_schema=targeted_schema, search_fields=search_fields
+            )
+            return dump_page(targeted_schema, items, page_info)
+
+        async def load_page() -> bytes:
+            async with async_session_maker() as flight_session:
+                items, page_info = await self._get_page(
+                    session=flight_session, params=params, targeted_schema=targeted_schema, search_fields=search_fields
+                )
+                page_json = dump_page(targeted_schema, items, page_info)
+            await listing_cache.set(page_key, page_json, ttl=cache_ttl)
+            return page_json
+
+        single_flight = get_single_flight(self.model.__tablename__)
+        return await single_flight.do(page_key, load_page, wait_for=lambda: redis_service.get_cache(page_key))
+
+    def _get_fulltext_search(
+        self, q: str, search_fields: list[InstrumentedAttribute]
+    ) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+        """
+        Uses GIN indexes: search_vector @@ prefix tsquery (all words, any order)
+        OR pg_trgm similarity (%) for typos on short fields.
+        search_fields are mapped to tsvector weights, so only these columns are searched.
+        """
+        weights = "".join(self.model.search_weights.get(field.key, "") for field in search_fields)
+        words = [re.sub(r"\W", "", word) for word in q.split()]
+        words = [word for word in words if len(word) > 1]
+
+        conditions = []
+        ranks = []
+        if words:
+            ts_query = func.to_tsquery("simple", " & ".join(f"{word}:*{weights}" for word in words))
+            conditions.append(self.model.search_vector.op("@@")(ts_query))
+            ranks.append(func.ts_rank(self.model.search_vector, ts_query))
+
+        trigram_fields = [field for field in search_fields if field.key in self.model.search_trigram_fields]
+        for field in trigram_fields:
+            conditions.append(field.op("%")(q))
+        if trigram_fields:
+            ranks.append(func.greatest(*(func.similarity(field, q) for field in trigram_fields)))
+
+        if not conditions:
+            return true(), literal(0)
+
+        search_rank = ranks[0]
+        for rank in ranks[1:]:
+            search_rank = search_rank + rank
+        return or_(*conditions), search_rank
+
+    async def get_estimated_count(self, session: AsyncSession) -> int | None:
+        """
+        Rows count from planner statistics (updated by autovacuum/ANALYZE), costs nothing even on huge tables.
+        Is not exact and does not know about filters. None - table was never analyzed.
+        """
+        query = text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table_name AS regclass)")
+        result = await session.execute(query, {"table_name": self.model.__tablename__})
+        estimated_count = result.scalar()
+        if estimated_count is None or estimated_count < 0:
+            return None
+        return estimated_count
+
+    async def _get_items_by_cursor(
+        self,
+        query: Select,
+        *,
+        params: SearchParams,
+        sort_field: InstrumentedAttribute,
+        is_projection: bool = False,
+        session: AsyncSession,
+    ) -> tuple[list[Base | Row], str | None, str | None]:
+        """
+        Keyset pagination: WHERE (sort_field, id) > / < (cursor values) instead of OFFSET,
+        so every page costs the same as the first one ((sort field, id) index is used, see models __table_args__).
+        """
+        cursor = None
+        if params.cursor:
+            try:
+                cursor = PaginationCursor.decode(params.cursor)
+            except ValueError as e:
+                raise HTTPException(detail=str(e), status_code=status.HTTP_400_BAD_REQUEST)
+            if cursor.sort_by != params.sort_by:
+                raise HTTPException(
+                    detail="Cursor was issued for another sort_by, start from the first page",
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                )
+
+        is_backward = bool(cursor) and cursor.direction == CursorDirectionEnum.PREV
+        # moving backward = reading in the opposite direction and reversing the page
+        is_ascending = (params.order_direction == SortEnum.ASC) != is_backward
+        order_direction = asc if is_ascending else desc
+
+        key_columns = [self.model.id] if sort_field is self.model.id else [sort_field, self.model.id]
+        if cursor:
+            key_values = [cursor.id] if len(key_columns) == 1 else [cursor.value, cursor.id]
+            key = tuple_(*key_columns)
+            query = query.filter(key > tuple_(*key_values) if is_ascending else key < tuple_(*key_values))
+
+        query = query.order_by(*(order_direction(column) for column in key_columns)).limit(params.limit + 1)
+        result = await session.execute(query)
+        items = list(result.all() if is_projection else result.scalars().all())
+
+        has_more = len(items) > params.limit
+        items = items[: params.limit]
+        if is_backward:
+            items.reverse()
+
+        if not items:
+            return items, None, None
+
+        def make_cursor(item: Base | Row, direction: CursorDirectionEnum) -> str:
+            return PaginationCursor(
+                sort_by=params.sort_by, value=getattr(item, params.sort_by), id=item.id, direction=direction
+            ).encode()
+
+        has_next = has_more if not is_backward else True
+        has_prev = has_more if is_backward else bool(cursor)
+        next_cursor = make_cursor(items[-1], CursorDirectionEnum.NEXT) if has_next else None
+        prev_cursor = make_cursor(items[0], CursorDirectionEnum.PREV) if has_prev else None
+        return items, next_cursor, prev_cursor
 
     async def get_items(
         self,
@@ -106,35 +374,67 @@ class BaseCRUD(ABC):
         result = await session.execute(query)
         return result.scalars().all()
 
+    async def get_items_by_values(
+        self,
+        *,
+        session: AsyncSession,
+        values: list[Any],
+        field: InstrumentedAttribute,
+    ) -> list[Base]:
+        """one query for many values: WHERE field = ANY(:values), list is sent as one array parameter"""
+        query = select(self.model).filter(field == any_(literal(values, type_=ARRAY(field.type))))
+        result = await session.execute(query)
+        return result.scalars().all()
+
     async def patch_item(
         self, instance_id: int, *, session: AsyncSession, data_to_patch: BaseModel, exclude_unset: bool = True
     ) -> Optional[Base]:
         """
         exclude_unset is used to show if None or default_factory must be excluded
+
+        One statement: UPDATE ... WHERE id = :id [AND version = :version] RETURNING *
+        Optimistic Offline Lock is checked by Postgres itself, so there is no race between read and write.
         """
-        item = await self.get_item(field=self.model.id, field_value=instance_id, session=session)
+        data_for_updating: dict = data_to_patch.model_dump(exclude={"id"}, exclude_unset=exclude_unset)
+        query = update(self.model).where(self.model.id == instance_id)
+
+        is_versioned = hasattr(self.model, "version")
+        if is_versioned:
+            provided_version = getattr(data_to_patch, "version", None)
+            if provided_version is None:
+                raise HTTPException(
+                    detail="Optimistic Offline Lock for instance enabled, but current version not provided",
+                    status_code=status.HTTP_409_CONFLICT,
+                )
+            query = query.where(self.model.version == provided_version)
+            data_for_updating |= {"version": provided_version + 1}
+
+        data_for_updating |= self.get_derived_values(data_for_updating)
+        query = query.values(**data_for_updating).returning(self.model).execution_options(populate_existing=True)
+        result = await session.execute(query)
+        item = result.scalar_one_or_none()
+
         if not item:
+            await session.rollback()
+            # failure path only - find out why nothing was updated
+            if is_versioned and await self.any_item_exists(session, field_value=instance_id, field=self.model.id):
+                raise HTTPException(
+                    detail="Optimistic Offline Lock for instance enabled, but current version is outdated",
+                    status_code=status.HTTP_409_CONFLICT,
+                )
             raise HTTPException(
                 detail=f"Item with id #{instance_id} was not found",
                 status_code=status.HTTP_404_NOT_FOUND,
             )
-        data_for_updating: dict = data_to_patch.model_dump(exclude={"id"}, exclude_unset=exclude_unset)
 
-        optimistic_offline_lock_version = getattr(item, "version", None)
-        if optimistic_offline_lock_version:
-            if optimistic_offline_lock_version != getattr(data_to_patch, "version"):
-                raise HTTPException(
-                    detail=f"Optimistic Offline Lock for instance enabled, but current version not provided or outdated",
-                    status_code=status.HTTP_409_CONFLICT,
-                )
-            data_for_updating |= {"version": data_to_patch.version + 1}
-        print(data_for_updating, 999999999999999999999999999999999999999999999)
-        query = update(self.model).where(self.model.id == instance_id).values(**data_for_updating)
-        await session.execute(query)
         await session.commit()
-        await session.refresh(item)
+        await self.invalidate_listings()
         return item
 
+    def get_derived_values(self, values: dict) -> dict:
+        """columns calculated from written ones - bulk UPDATE statements do not run ORM events"""
+        return {}
+
     async def delete_item(self, instance_id: int, *, session: AsyncSession) -> bool:
         item = await self.get_item(field=self.model.id, field_value=instance_id, session=session)
         if not item:
@@ -146,8 +446,13 @@ class BaseCRUD(ABC):
         query = delete(self.model).where(self.model.id == instance_id)
         await session.execute(query)
         await session.commit()
+        await self.invalidate_listings()
         return True
 
+    async def invalidate_listings(self) -> None:
+        """cached pages of get_items_paginated_json(cache_ttl=...) for this model become unreachable"""
+        await listing_cache.bump_generation(self.model.__tablename__)
+
     async def any_item_exists(
         self,
         session: AsyncSession,
@@ -159,22 +464,49 @@ class BaseCRUD(ABC):
         return result.scalar()
 
     async def get_or_create(self, session: AsyncSession, only_get: bool = False, defaults: dict = None, **kwargs):
+        """
+        One statement for both cases (needs unique index/constraint on kwargs fields):
+        WITH existing AS (SELECT * FROM <table> WHERE <kwargs> LIMIT 1),
+        inserted AS (INSERT ... SELECT <values> WHERE NOT EXISTS (SELECT 1 FROM existing)
+                     ON CONFLICT DO NOTHING RETURNING *)
+        SELECT * FROM existing UNION ALL SELECT * FROM inserted
 
+        Existing row costs one round trip without a write - no sequence value is used and nothing is committed.
+        A row inserted by a concurrent transaction after our snapshot is not visible for this statement,
+        so it is picked up by the fallback select.
+        """
         query = select(self.model).filter_by(**kwargs)
-        result = await session.execute(query)
-        instance = result.scalar_one_or_none()
-
-        if instance or only_get:
-            return instance
+        if only_get:
+            result = await session.execute(query)
+            return result.scalar_one_or_none()
 
-        instance = self.model(**kwargs, **(defaults or {}))
-        session.add(instance)
+        table = self.model.__table__
+        values = {**kwargs, **(defaults or {})}
+        existing = select(table).where(*(table.c[field] == value for field, value in kwargs.items())).limit(1)
+        existing = existing.cte("existing")
+        inserted = (
+            pg_insert(table)
+            .from_select(
+                list(values),
+                select(*(literal(value, table.c[field].type) for field, value in values.items())).where(
+                    ~select(existing).exists()
+                ),
+            )
+            .on_conflict_do_nothing()
+            .returning(*table.c, literal(True).label("is_created"))
+            .cte("inserted")
+        )
+        upsert_query = select(self.model, inserted.c.is_created).from_statement(
+            union_all(select(existing, literal(False).label("is_created")), select(inserted))
+        )
 
-        try:
-            await session.commit()
-            await session.refresh(instance)
-            return instance
-        except IntegrityError:
-            await session.rollback()
+        result = await session.execute(upsert_query, execution_options={"populate_existing": True})
+        row = result.one_or_none()
+        if row is None:
             result = await session.execute(query)
             return result.scalar_one_or_none()
+
+        instance, is_created = row
+        if is_created:
+            await session.commit()
+        return instance
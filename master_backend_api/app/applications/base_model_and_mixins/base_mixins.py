@@ -1,6 +1,8 @@
 import uuid
 from datetime import datetime
 
+from sqlalchemy import Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
@@ -25,3 +27,15 @@ class CreateUpdateAtMixin(CreatedAtMixin, UpdatedAtMixin):
 
 class UUIDMixin:
     uuid_data: Mapped[uuid.UUID] = mapped_column(default=uuid.uuid4)
+
+
+def search_vector_column(weights: dict[str, str]):
+    """
+    tsvector for full-text search, generated by Postgres itself, so it is always in sync with source columns.
+    weights - {column: "A" | "B" | "C" | "D"}, used to search only in some columns and for ranking.
+    deferred - is not loaded with the instance, it is needed only inside WHERE/ORDER BY.
+    """
+    expression = " || ".join(
+        f"setweight(to_tsvector('simple', coalesce({column}, '')), '{weight}')" for column, weight in weights.items()
+    )
+    return mapped_column(TSVECTOR, Computed(expression, persisted=True), deferred=True)
@@ -1,5 +1,8 @@
+import base64
+import json
+from datetime import datetime
 from enum import IntEnum, StrEnum
-from typing import Annotated, Optional
+from typing import Annotated, Any, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -19,6 +22,27 @@ class SortFields(StrEnum):
     CREATED_AT = "created_at"
 
 
+class PaginationModeEnum(StrEnum):
+    OFFSET = "offset"
+    CURSOR = "cursor"
+
+
+class TotalModeEnum(StrEnum):
+    EXACT = "exact"
+    WINDOW = "window"
+    ESTIMATED = "estimated"
+
+
+class SearchEngineEnum(StrEnum):
+    ILIKE = "ilike"
+    FULLTEXT = "fulltext"
+
+
+class CursorDirectionEnum(StrEnum):
+    NEXT = "next"
+    PREV = "prev"
+
+
 class SearchParams(BaseModel):
     q: Annotated[Optional[str], Field(default=None)] = None
     page: Annotated[int, Field(default=1, ge=1)]
@@ -26,7 +50,54 @@ class SearchParams(BaseModel):
     order_direction: SortEnum = SortEnum.DESC
     sort_by: SortFields = SortFields.ID
     use_sharp_filter: bool = Field(default=False, description="used to search exact q")
+    search_engine: SearchEngineEnum = Field(
+        default=SearchEngineEnum.ILIKE,
+        description="fulltext - tsvector + pg_trgm (typo tolerant), results are ordered by rank",
+    )
+    pagination_mode: PaginationModeEnum = Field(
+        default=PaginationModeEnum.OFFSET,
+        description="cursor mode does not use OFFSET, so deep pages cost the same as the first one",
+    )
+    cursor: Optional[str] = Field(default=None, description="next_cursor or prev_cursor from the previous response")
+    with_total: bool = Field(default=True, description="if false - total and pages are not counted, use has_next")
+    total_mode: TotalModeEnum = Field(
+        default=TotalModeEnum.EXACT,
+        description="window - total in the same query as items, estimated - planner statistics for listings without q",
+    )
 
     @field_validator("q")
     def strip_q(cls, v):
         return v.strip() if v else v
+
+
+class PaginationCursor(BaseModel):
+    """
+    Keyset position: value of the sort field plus id as a tiebreaker.
+    Is sent to the client as an opaque urlsafe base64 token.
+    """
+
+    sort_by: SortFields
+    value: Any
+    id: int
+    direction: CursorDirectionEnum = CursorDirectionEnum.NEXT
+
+    def encode(self) -> str:
+        value = self.value.isoformat() if isinstance(self.value, datetime) else self.value
+        raw = json.dumps([self.sort_by, value, self.id, self.direction], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "PaginationCursor":
+        """raises ValueError if token is broken"""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            sort_by, value, item_id, direction = json.loads(raw)
+            sort_by, direction = SortFields(sort_by), CursorDirectionEnum(direction)
+            if sort_by == SortFields.ID:
+                if not isinstance(value, int):
+                    raise ValueError("id value must be integer")
+            else:
+                value = datetime.fromisoformat(value)
+            return cls(sort_by=sort_by, value=value, id=item_id, direction=direction)
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {e}")
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel, Field
 
@@ -17,10 +18,13 @@ class InstanceVersion(BaseModel):
 
 class PaginationResponse(BaseModel):
     items: list
-    total: int
+    total: Optional[int] = None
     page: int
     limit: int
-    pages: int
+    pages: Optional[int] = None
+    has_next: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 class StatusSuccess(BaseModel):
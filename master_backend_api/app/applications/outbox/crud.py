@@ -0,0 +1,59 @@
+from sqlalchemy import delete, func, literal_column, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from applications.base_crud import BaseCRUD
+from applications.outbox.models import OutboxMessage
+from settings import settings
+
+
+class OutboxDBManager(BaseCRUD):
+
+    def __init__(self):
+        self.model = OutboxMessage
+
+    def add_message(self, session: AsyncSession, queue_name: str, payload: dict) -> OutboxMessage:
+        """no commit - message is saved (or rolled back) together with the caller's transaction"""
+        message = self.model(queue_name=queue_name, payload=payload)
+        session.add(message)
+        return message
+
+    async def claim_batch(self, session: AsyncSession, limit: int) -> list[OutboxMessage]:
+        """
+        FOR UPDATE SKIP LOCKED - relays of all workers drain the table together, a row is taken by one of them.
+        Rows stay locked until the caller's transaction ends.
+        """
+        query = (
+            select(self.model)
+            .where(self.model.available_at <= func.now())
+            .order_by(self.model.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(query)
+        return result.scalars().all()
+
+    async def delete_messages(self, session: AsyncSession, message_ids: list[int]) -> None:
+        await session.execute(delete(self.model).where(self.model.id.in_(message_ids)))
+
+    async def postpone_messages(self, session: AsyncSession, message_ids: list[int]) -> None:
+        """exponential backoff: 2 ** attempts seconds, up to OUTBOX_RETRY_MAX_DELAY_SECONDS"""
+        delay_seconds = func.least(func.power(2, self.model.attempts), settings.OUTBOX_RETRY_MAX_DELAY_SECONDS)
+        query = (
+            update(self.model)
+            .where(self.model.id.in_(message_ids))
+            .values(
+                attempts=self.model.attempts + 1,
+                available_at=func.now() + delay_seconds * literal_column("interval '1 second'"),
+            )
+        )
+        await session.execute(query)
+
+    async def get_backlog(self, session: AsyncSession) -> tuple[int, float]:
+        """messages waiting in the table and how long the oldest available one waits (seconds, 0 - none is due)"""
+        oldest_age = func.greatest(func.extract("epoch", func.now() - func.min(self.model.available_at)), 0)
+        query = select(func.count(), func.coalesce(oldest_age, 0)).select_from(self.model)
+        pending, oldest_age_seconds = (await session.execute(query)).one()
+        return pending, float(oldest_age_seconds)
+
+
+outbox_manager = OutboxDBManager()
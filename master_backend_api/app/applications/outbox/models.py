@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import Index, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from applications.base_model_and_mixins.base_mixins import CreatedAtMixin, PKMixin
+from applications.base_model_and_mixins.base_models import Base
+
+
+class OutboxMessage(PKMixin, CreatedAtMixin, Base):
+    """
+    Message for RabbitMQ written in the same transaction as the data it is about.
+    Row is deleted by outbox relay after the broker confirmed the message.
+    """
+
+    __tablename__ = "outbox_messages"
+
+    queue_name: Mapped[str] = mapped_column(String, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    attempts: Mapped[int] = mapped_column(default=0)
+    available_at: Mapped[datetime] = mapped_column(default=func.now(), doc="Not published before, used for retries")
+
+    __table_args__ = (Index("ix_outbox_messages_available_at", "available_at"),)
+
+    def __str__(self):
+        return f"OutboxMessage {self.queue_name} - #{self.id}"
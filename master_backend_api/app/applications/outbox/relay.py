@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+
+from prometheus_client import Counter, Gauge
+
+from applications.base_model_and_mixins.base_models import async_session_maker
+from applications.outbox.crud import outbox_manager
+from services.rabbit.rabbitmq_service import rabbitmq_producer
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+outbox_messages_relayed_total = Counter(
+    "outbox_messages_relayed_total",
+    "Outbox messages by result: published, postponed (will be retried)",
+    ["queue", "result"],
+)
+# backlog of the broker: not published messages wait in outbox_messages, not in a local buffer
+outbox_pending_messages = Gauge("outbox_pending_messages", "Messages waiting in outbox_messages table")
+outbox_oldest_message_age_seconds = Gauge(
+    "outbox_oldest_message_age_seconds", "How long the oldest due outbox message waits for publishing"
+)
+
+
+class OutboxRelay:
+    """
+    Background task (started in lifespan) which moves outbox_messages to RabbitMQ by batches.
+    Row is deleted in the same transaction after the broker confirmed the message, not confirmed ones are postponed.
+    Delivery is at least once - consumers must tolerate a duplicate after a crash between publish and commit.
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self._wake_up = asyncio.Event()
+        self._backlog_measured_at = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._relay_forever())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def wake_up(self) -> None:
+        """new message was committed in this worker - do not wait for OUTBOX_RELAY_INTERVAL_SECONDS"""
+        self._wake_up.set()
+
+    async def _relay_forever(self) -> None:
+        while True:
+            self._wake_up.clear()
+            try:
+                relayed = await self.relay_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox messages were not relayed")
+                relayed = 0
+            await self._measure_backlog()
+
+            # full batch - there can be more messages waiting
+            if relayed < settings.OUTBOX_RELAY_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self._wake_up.wait(), timeout=settings.OUTBOX_RELAY_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _measure_backlog(self) -> None:
+        """gauges are refreshed once per OUTBOX_RELAY_INTERVAL_SECONDS, not after every batch"""
+        if time.monotonic() - self._backlog_measured_at < settings.OUTBOX_RELAY_INTERVAL_SECONDS:
+            return
+        self._backlog_measured_at = time.monotonic()
+        try:
+            async with async_session_maker() as session:
+                pending, oldest_age_seconds = await outbox_manager.get_backlog(session)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Outbox backlog was not measured")
+            return
+        outbox_pending_messages.set(pending)
+        outbox_oldest_message_age_seconds.set(oldest_age_seconds)
+
+    async def relay_batch(self) -> int:
+        async with async_session_maker() as session:
+            messages = await outbox_manager.claim_batch(session, limit=settings.OUTBOX_RELAY_BATCH_SIZE)
+            if not messages:
+                return 0
+
+            try:
+                confirmed = await rabbitmq_producer.publish(
+                    [(message.queue_name, message.payload) for message in messages]
+                )
+            except Exception:
+                # broker is not reachable - the batch gets backoff as not confirmed, rows are not re-locked at once
+                logger.exception("Outbox batch of %s messages was not published", len(messages))
+                confirmed = [False] * len(messages)
+            published = [message for message, is_confirmed in zip(messages, confirmed) if is_confirmed]
+            postponed = [message for message, is_confirmed in zip(messages, confirmed) if not is_confirmed]
+            if published:
+                await outbox_manager.delete_messages(session, [message.id for message in published])
+            if postponed:
+                await outbox_manager.postpone_messages(session, [message.id for message in postponed])
+            await session.commit()
+
+        for result, result_messages in (("published", published), ("postponed", postponed)):
+            for message in result_messages:
+                outbox_messages_relayed_total.labels(message.queue_name, result).inc()
+        return len(messages)
+
+
+outbox_relay = OutboxRelay()
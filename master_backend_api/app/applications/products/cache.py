@@ -0,0 +1,178 @@
+import asyncio
+import logging
+from contextlib import suppress
+from enum import StrEnum
+
+from prometheus_client import Counter
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from services.redis_service import redis_service
+from settings import settings
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+catalog_cache_requests_total = Counter(
+    "catalog_cache_requests_total", "Lookups of single product/category in cache", ["entity", "result"]
+)
+catalog_cache_errors_total = Counter(
+    "catalog_cache_errors_total",
+    "Redis errors of catalog cache, the request goes on without it",
+    ["entity", "operation"],
+)
+
+
+# the item is cached only if it was not invalidated while being loaded from DB,
+# otherwise the old row would be stored after the write dropped the key
+SET_IF_GENERATION_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+class CatalogEntityEnum(StrEnum):
+    PRODUCT = "product"
+    CATEGORY = "category"
+
+
+class CatalogCache:
+    """
+    Read-through cache of GET /products/{id} and GET /categories/{id}: in process LRU -> Redis -> DB.
+    Ready response JSON is stored, so hits skip the query, nh3/ensure_full_url validators and serialization.
+
+    Every write drops the Redis key, bumps its generation and publishes the key to INVALIDATION_CHANNEL,
+    listener of every worker removes the key from its LRU.
+    Loaded item is stored only if the generation read before the query did not change (compare-and-set).
+    Redis is optional for reads and writes: its errors are logged and counted, read goes to DB.
+    """
+
+    INVALIDATION_CHANNEL = "catalog:invalidate"
+
+    def __init__(self):
+        self.local = TTLCache(max_size=settings.CATALOG_CACHE_LOCAL_SIZE, ttl=settings.CATALOG_CACHE_LOCAL_TTL_SECONDS)
+        self._listener: asyncio.Task | None = None
+
+    @staticmethod
+    def _key(entity: CatalogEntityEnum, item_id: int) -> str:
+        return f"catalog:{entity}:{item_id}"
+
+    @staticmethod
+    def _generation_key(key: str) -> str:
+        return f"{key}:generation"
+
+    async def get(self, entity: CatalogEntityEnum, item_id: int) -> str | None:
+        key = self._key(entity, item_id)
+        raw = self.local.get(key)
+        if raw is not None:
+            catalog_cache_requests_total.labels(entity, "hit_local").inc()
+            return raw
+
+        try:
+            raw = await redis_service.get_cache(key)
+        except RedisError:
+            logger.warning("Catalog cache read of %s failed, reading from DB", key, exc_info=True)
+            catalog_cache_errors_total.labels(entity, "get").inc()
+            raw = None
+        if raw is not None:
+            catalog_cache_requests_total.labels(entity, "hit_redis").inc()
+            self.local.set(key, raw)
+            return raw
+
+        catalog_cache_requests_total.labels(entity, "miss").inc()
+        return None
+
+    async def get_shared(self, entity: CatalogEntityEnum, item_id: int) -> str | None:
+        """Redis only, is polled while another worker loads the item (single flight)"""
+        key = self._key(entity, item_id)
+        try:
+            raw = await redis_service.get_cache(key)
+        except RedisError:
+            catalog_cache_errors_total.labels(entity, "get").inc()
+            return None
+        if raw is not None:
+            self.local.set(key, raw)
+        return raw
+
+    async def get_generation(self, entity: CatalogEntityEnum, item_id: int) -> str | None:
+        """is read before loading the item from DB, None - Redis is not available"""
+        key = self._key(entity, item_id)
+        try:
+            generation = await redis_service.get_cache(self._generation_key(key))
+        except RedisError:
+            catalog_cache_errors_total.labels(entity, "get_generation").inc()
+            return None
+        return generation or "0"
+
+    async def set(self, entity: CatalogEntityEnum, item_id: int, schema: BaseModel, generation: str | None) -> str:
+        """
+        by_alias - the same JSON as FastAPI response_model gives.
+        Is not cached if the item was invalidated after get_generation or the generation is unknown.
+        """
+        key = self._key(entity, item_id)
+        raw = schema.model_dump_json(by_alias=True)
+        if generation is None:
+            return raw
+        try:
+            async with redis_service.get_redis() as redis:
+                is_set = await redis.eval(
+                    SET_IF_GENERATION_SCRIPT,
+                    2,
+                    key,
+                    self._generation_key(key),
+                    generation,
+                    raw,
+                    settings.CATALOG_CACHE_TTL_SECONDS,
+                )
+        except RedisError:
+            logger.warning("Catalog cache write of %s failed", key, exc_info=True)
+            catalog_cache_errors_total.labels(entity, "set").inc()
+            return raw
+        if is_set:
+            self.local.set(key, raw)
+        return raw
+
+    async def invalidate(self, entity: CatalogEntityEnum, item_id: int) -> None:
+        """is called after commit, so failure is not raised - the write is done, stale copies expire by ttl"""
+        key = self._key(entity, item_id)
+        self.local.pop(key)
+        try:
+            async with redis_service.pipeline() as p:
+                p.delete(key)
+                # generation only has to outlive loads which started before this write
+                p.incr(self._generation_key(key))
+                p.expire(self._generation_key(key), settings.CATALOG_CACHE_TTL_SECONDS)
+                p.publish(self.INVALIDATION_CHANNEL, key)
+        except RedisError:
+            logger.error("Catalog cache invalidation of %s failed", key, exc_info=True)
+            catalog_cache_errors_total.labels(entity, "invalidate").inc()
+
+    def start_listener(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop_listener(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._listener
+        self._listener = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with redis_service.redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                    # messages sent while the worker was not subscribed are lost
+                    self.local.clear()
+                    async for message in pubsub.listen():
+                        self.local.pop(message["data"])
+            except RedisError:
+                await asyncio.sleep(1)
+
+
+catalog_cache = CatalogCache()
@@ -1,21 +1,76 @@
 from applications.base_crud import BaseCRUD
+from applications.base_model_and_mixins.base_models import async_session_maker
+from applications.products.cache import CatalogEntityEnum, catalog_cache
 from applications.products.models import Category, Product, Order, OrderProduct
+from applications.products.schemas import ChangeOrderProductQuantitySchema
+from pydantic import BaseModel
+from services.single_flight import get_single_flight
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import asc, delete, desc, func, or_, select, update, exists
+from sqlalchemy import Boolean, Float, Integer, case, column, func, literal, literal_column, select, values
 from sqlalchemy.orm import selectinload
+from utils.etag import make_etag
+
+
+class CatalogCacheMixin:
+    """
+    Cached response JSON of one item, see applications/products/cache.py.
+    Every write drops it in all workers.
+    """
+
+    cache_entity: CatalogEntityEnum
+
+    async def get_item_json(self, item_id: int, targeted_schema: type[BaseModel]) -> str | None:
+        """None - item does not exist. Concurrent misses of the same item share one query (single flight)"""
+        cached = await catalog_cache.get(self.cache_entity, item_id)
+        if cached is not None:
+            return cached
+
+        async def load_item() -> str | None:
+            generation = await catalog_cache.get_generation(self.cache_entity, item_id)
+            async with async_session_maker() as session:
+                item = await self.get_item(field=self.model.id, field_value=item_id, session=session)
+            if not item:
+                return None
+            return await catalog_cache.set(self.cache_entity, item_id, targeted_schema.from_orm(item), generation)
+
+        single_flight = get_single_flight(self.cache_entity)
+        return await single_flight.do(
+            str(item_id), load_item, wait_for=lambda: catalog_cache.get_shared(self.cache_entity, item_id)
+        )
+
+    async def create_instance(self, session: AsyncSession, **kwargs):
+        instance = await super().create_instance(session, **kwargs)
+        await catalog_cache.invalidate(self.cache_entity, instance.id)
+        return instance
+
+    async def patch_item(self, instance_id: int, **kwargs):
+        item = await super().patch_item(instance_id, **kwargs)
+        await catalog_cache.invalidate(self.cache_entity, instance_id)
+        return item
+
+    async def delete_item(self, instance_id: int, *, session: AsyncSession) -> bool:
+        deleted = await super().delete_item(instance_id, session=session)
+        await catalog_cache.invalidate(self.cache_entity, instance_id)
+        return deleted
 
 
-class CategoryDBManager(BaseCRUD):
+class CategoryDBManager(CatalogCacheMixin, BaseCRUD):
+    cache_entity = CatalogEntityEnum.CATEGORY
 
     def __init__(self):
         self.model = Category
 
 
-class ProductDBManager(BaseCRUD):
+class ProductDBManager(CatalogCacheMixin, BaseCRUD):
+    cache_entity = CatalogEntityEnum.PRODUCT
 
     def __init__(self):
         self.model = Product
 
+    def get_derived_values(self, values: dict) -> dict:
+        return Product.get_safe_values(values)
+
 
 class OrderDBManager(BaseCRUD):
 
@@ -41,6 +96,43 @@ class OrderDBManager(BaseCRUD):
         order.order_products = [op for op in order.order_products if op.quantity > 0]
         return order
 
+    async def get_open_order_etag(self, user_id: int, with_zero_products: bool, session: AsyncSession) -> str | None:
+        """
+        ETag of the cart by one aggregate query, products are not loaded. None - user has no open order.
+        Must give the same value as order_etag() for the loaded order.
+        """
+        query = (
+            select(
+                self.model.id,
+                self.model.updated_at,
+                func.count(OrderProduct.id),
+                func.max(OrderProduct.updated_at),
+                func.max(Product.updated_at),
+            )
+            .outerjoin(OrderProduct, OrderProduct.order_id == self.model.id)
+            .outerjoin(Product, Product.id == OrderProduct.product_id)
+            .where(self.model.user_id == user_id, self.model.is_closed.is_(False))
+            .group_by(self.model.id)
+        )
+        row = (await session.execute(query)).first()
+        if row is None:
+            return None
+        return make_etag("orders", *row, with_zero_products)
+
+    @staticmethod
+    def order_etag(order: Order, with_zero_products: bool) -> str:
+        """ETag of the order with loaded order_products and products"""
+        order_products = order.order_products
+        return make_etag(
+            "orders",
+            order.id,
+            order.updated_at,
+            len(order_products),
+            max((item.updated_at for item in order_products), default=None),
+            max((item.product.updated_at for item in order_products), default=None),
+            with_zero_products,
+        )
+
 
 class OrderProductDBManager(BaseCRUD):
 
@@ -54,20 +146,97 @@ class OrderProductDBManager(BaseCRUD):
         quantity: int,
         session: AsyncSession,
         is_set_quantity: bool = False,
-    ):
-        order_product: OrderProduct = await self.get_or_create(
-            session=session, order_id=order_id, product_id=product.id
+    ) -> OrderProduct:
+        """
+        One statement, quantity is changed by Postgres, so concurrent clicks (two tabs) do not lose updates:
+        INSERT ... ON CONFLICT (order_id, product_id) DO UPDATE SET quantity = GREATEST(quantity + :delta, 0)
+        rows with zero quantity are not deleted - leave it as a log in DB
+        """
+        table = self.model.__table__
+        insert_query = pg_insert(table).values(
+            order_id=order_id,
+            product_id=product.id,
+            price=product.price,
+            quantity=abs(quantity) if is_set_quantity else max(quantity, 0),
         )
         if is_set_quantity:
-            order_product.quantity = abs(quantity)
+            new_quantity = insert_query.excluded.quantity
         else:
-            order_product.quantity += quantity
-            if order_product.quantity < 0:
-                order_product.quantity = 0  # we do not delete - leave it as a log in DB
-        order_product.price = product.price
-        session.add(order_product)
+            new_quantity = func.greatest(table.c.quantity + quantity, 0)
+
+        upsert_query = insert_query.on_conflict_do_update(
+            index_elements=[table.c.order_id, table.c.product_id],
+            set_={"quantity": new_quantity, "price": insert_query.excluded.price, "updated_at": func.now()},
+        ).returning(*table.c)
+
+        result = await session.execute(
+            select(self.model).from_statement(upsert_query), execution_options={"populate_existing": True}
+        )
+        order_product: OrderProduct = result.scalar_one()
+        await session.commit()
+        return order_product
+
+    async def bulk_change_quantity_and_set_current_price(
+        self,
+        products: list[Product],
+        order_id: int,
+        operations: list[ChangeOrderProductQuantitySchema],
+        session: AsyncSession,
+    ) -> list[OrderProduct]:
+        """
+        All operations in one INSERT ... SELECT FROM (VALUES ...) ON CONFLICT DO UPDATE statement.
+        Mode differs per row, so new quantity is taken from the same VALUES list by a correlated subquery.
+        Every product must be present only once - Postgres can not update the same row twice in one statement.
+        """
+        table = self.model.__table__
+        prices = {product.id: product.price for product in products}
+        ops = values(
+            column("product_id", Integer),
+            column("price", Float),
+            column("quantity", Integer),
+            column("is_set", Boolean),
+            name="ops",
+        ).data(
+            [
+                (
+                    operation.product_id,
+                    prices[operation.product_id],
+                    operation.quantity_delta,
+                    operation.is_set_quantity,
+                )
+                for operation in operations
+            ]
+        )
+
+        insert_query = pg_insert(table).from_select(
+            ["order_id", "product_id", "price", "quantity"],
+            select(literal(order_id), ops.c.product_id, ops.c.price, func.greatest(ops.c.quantity, 0)),
+        )
+        # SQLAlchemy does not correlate subqueries inside ON CONFLICT DO UPDATE,
+        # so the conflicting row and excluded are referenced by name to keep them out of the subquery FROM
+        current_quantity = literal_column(f"{table.name}.quantity", Integer)
+        excluded_product_id = literal_column("excluded.product_id", Integer)
+        new_quantity = (
+            select(
+                case(
+                    (ops.c.is_set, ops.c.quantity),
+                    else_=func.greatest(current_quantity + ops.c.quantity, 0),
+                )
+            )
+            .where(ops.c.product_id == excluded_product_id)
+            .scalar_subquery()
+        )
+        upsert_query = insert_query.on_conflict_do_update(
+            index_elements=[table.c.order_id, table.c.product_id],
+            set_={"quantity": new_quantity, "price": insert_query.excluded.price, "updated_at": func.now()},
+        ).returning(*table.c)
+
+        result = await session.execute(
+            select(self.model).from_statement(upsert_query), execution_options={"populate_existing": True}
+        )
+        order_products = result.scalars().all()
         await session.commit()
-        await session.refresh(order_product)
+        return order_products
 
 
 category_manager = CategoryDBManager()
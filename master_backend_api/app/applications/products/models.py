@@ -1,9 +1,18 @@
-from sqlalchemy import ForeignKey, String, UniqueConstraint, Integer
+from typing import Any, ClassVar
+
+import nh3
+from sqlalchemy import ForeignKey, Index, String, UniqueConstraint, Integer, event, text
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from applications.base_model_and_mixins.base_mixins import CreateUpdateAtMixin, PKMixin, UUIDMixin
+from applications.base_model_and_mixins.base_mixins import (
+    CreateUpdateAtMixin,
+    PKMixin,
+    UUIDMixin,
+    search_vector_column,
+)
 from applications.base_model_and_mixins.base_models import Base
+from utils.images import ensure_full_url
 
 
 class Category(PKMixin, CreateUpdateAtMixin, Base):
@@ -12,8 +21,20 @@ class Category(PKMixin, CreateUpdateAtMixin, Base):
     name: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
 
+    search_weights: ClassVar[dict[str, str]] = {"name": "A"}
+    search_trigram_fields: ClassVar[tuple[str, ...]] = ("name",)
+    search_vector: Mapped[str] = search_vector_column(search_weights)
+
     products = relationship("Product", back_populates="category")
 
+    __table_args__ = (
+        Index("ix_categories_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_categories_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        # keyset pagination: ORDER BY <SortFields>, id
+        Index("ix_categories_updated_at_id", "updated_at", "id"),
+        Index("ix_categories_created_at_id", "created_at", "id"),
+    )
+
     def __str__(self):
         return f"Category {self.name} - #{self.id}"
 
@@ -28,12 +49,59 @@ class Product(PKMixin, CreateUpdateAtMixin, UUIDMixin, Base):
     main_image: Mapped[str] = mapped_column(nullable=False)
     category_id: Mapped[int] = mapped_column(ForeignKey("categories.id", ondelete="RESTRICT"), nullable=False)
 
+    # sanitized / normalized on write (see get_safe_values), read paths serialize them as is
+    safe_title: Mapped[str] = mapped_column(String, nullable=False, default="")
+    safe_description: Mapped[str] = mapped_column(String, nullable=False, default="")
+    image_urls: Mapped[list[str]] = mapped_column(ARRAY(String), nullable=False, default=list)
+    main_image_url: Mapped[str] = mapped_column(String, nullable=False, default="")
+
+    search_weights: ClassVar[dict[str, str]] = {"title": "A", "description": "B"}
+    search_trigram_fields: ClassVar[tuple[str, ...]] = ("title",)
+    search_vector: Mapped[str] = search_vector_column(search_weights)
+
     category = relationship("Category", back_populates="products")
     order_products = relationship("OrderProduct", back_populates="product")
 
+    __table_args__ = (
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_products_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        # keyset pagination: ORDER BY <SortFields>, id
+        Index("ix_products_updated_at_id", "updated_at", "id"),
+        Index("ix_products_created_at_id", "created_at", "id"),
+    )
+
     def __str__(self):
         return f"Product {self.title} - #{self.id}"
 
+    @staticmethod
+    def get_safe_values(values: dict[str, Any]) -> dict[str, Any]:
+        """
+        Write-time columns for given source columns: html is stripped (xss), image paths become full urls.
+        Full urls depend on settings.WORK_URL - after its change rows must be re-saved (see backfill migration).
+        """
+        safe_values = {}
+        if "title" in values:
+            safe_values["safe_title"] = nh3.clean(values["title"] or "", tags=set())
+        if "description" in values:
+            safe_values["safe_description"] = nh3.clean(values["description"] or "", tags=set())
+        if "images" in values:
+            safe_values["image_urls"] = [ensure_full_url(image) for image in values["images"] or []]
+        if "main_image" in values:
+            safe_values["main_image_url"] = ensure_full_url(values["main_image"])
+        return safe_values
+
+    def fill_safe_values(self) -> None:
+        source_values = {field: getattr(self, field) for field in ("title", "description", "images", "main_image")}
+        for field, value in self.get_safe_values(source_values).items():
+            setattr(self, field, value)
+
+
+@event.listens_for(Product, "before_insert")
+@event.listens_for(Product, "before_update")
+def fill_product_safe_values(mapper, connection, target: Product) -> None:
+    """every ORM write (create_instance, sqladmin, session.add_all imports) keeps write-time columns in sync"""
+    target.fill_safe_values()
+
 
 class Order(PKMixin, CreateUpdateAtMixin, UUIDMixin, Base):
     __tablename__ = "orders"
@@ -50,6 +118,11 @@ class Order(PKMixin, CreateUpdateAtMixin, UUIDMixin, Base):
         lazy="selectin",
     )
 
+    __table_args__ = (
+        # one open order (cart) per user, also conflict target for get_or_create
+        Index("uq_orders_user_id_open", "user_id", unique=True, postgresql_where=text("NOT is_closed")),
+    )
+
     @property
     def cost(self) -> float:
         _cost = sum([product.price * product.quantity for product in self.order_products])
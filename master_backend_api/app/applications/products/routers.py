@@ -1,8 +1,7 @@
 import uuid
 from typing import Annotated
-from enum import StrEnum
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Path, UploadFile, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Path, Request, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from applications.base_queries import SearchParams
@@ -10,6 +9,8 @@ from applications.base_schemas import StatusSuccess
 from applications.products.crud import category_manager, product_manager, order_manager, order_product_manager
 from applications.products.models import Category, Product, Order
 from applications.products.schemas import (
+    ChangeOrderProductQuantitySchema,
+    ModeChangeOrderProductQuantityEnum,
     NewCategory,
     PaginationSavedCategoriesResponse,
     SavedCategory,
@@ -26,11 +27,14 @@ from dependencies.file_storage import validate_image, validate_images
 from dependencies.order import get_order
 from dependencies.product import get_product
 from dependencies.security import require_permissions, get_current_user
-from features_flags.feature_flags import FeatureFlags
+from features_flags.feature_flags import feature_flags
+from settings import settings
 from storage.s3 import s3_storage
 from prometheus_client import Counter
 
+from utils.etag import is_not_modified, make_etag, not_modified_response
 from utils.images import sanitize_filename
+from utils.responses import json_response
 
 router_categories = APIRouter()
 router_products = APIRouter()
@@ -41,26 +45,26 @@ custom_requests_categories_total = Counter(
 )
 
 
-class ModeChangeOrderProductQuantityEnum(StrEnum):
-    INCREASE = "increase"
-    DECREASE = "decrease"
-    SET = "set"
-
-
 @router_order.get("/")
 async def get_current_order(
+    request: Request,
     user: User = Depends(get_current_user),
     with_zero_products: bool = False,
     session: AsyncSession = Depends(get_async_session),
 ) -> OrderSchema:
-    order = await order_manager.get_or_create(user_id=user.id, is_closed=False, session=session)
+    etag = await order_manager.get_open_order_etag(user.id, with_zero_products=with_zero_products, session=session)
+    if etag and is_not_modified(request, etag):
+        return not_modified_response(etag)
 
-    if with_zero_products:
-        return order
+    order = await order_manager.get_or_create(user_id=user.id, is_closed=False, session=session)
+    order_schema = OrderSchema.from_orm(order)
+    if not with_zero_products:
+        order_schema.get_filtered_order()
 
-    response = OrderSchema.from_orm(order)
-    response.get_filtered_order()
-    return response
+    return json_response(
+        order_schema.model_dump_json(by_alias=True),
+        etag=order_manager.order_etag(order, with_zero_products=with_zero_products),
+    )
 
 
 @router_order.patch("/change-order-product-quantity")
@@ -83,6 +87,37 @@ async def change_order_product_quantity(
     return order_with_products
 
 
+@router_order.patch(
+    "/change-order-products-quantity",
+    description="Batch version of change-order-product-quantity: all operations in one transaction",
+)
+async def change_order_products_quantity(
+    operations: Annotated[list[ChangeOrderProductQuantitySchema], Body(min_length=1, max_length=100)],
+    order: Order = Depends(get_order),
+    session: AsyncSession = Depends(get_async_session),
+) -> OrderSchema:
+    product_ids = [operation.product_id for operation in operations]
+    if len(set(product_ids)) != len(product_ids):
+        raise HTTPException(
+            detail="Each product can be used only once per request",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    products = await product_manager.get_items_by_values(field=Product.id, values=product_ids, session=session)
+    missing_ids = set(product_ids) - {product.id for product in products}
+    if missing_ids:
+        raise HTTPException(
+            detail=f"Products with ids {sorted(missing_ids)} not found",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    await order_product_manager.bulk_change_quantity_and_set_current_price(
+        products=products, order_id=order.id, operations=operations, session=session
+    )
+    order_with_products: Order = await order_manager.get_order_with_product(order_id=order.id, session=session)
+    return order_with_products
+
+
 @router_categories.post(
     "/create",
     status_code=status.HTTP_201_CREATED,
@@ -108,33 +143,44 @@ async def create_category(
 
 @router_categories.get("/{id}")
 async def get_category(
+    request: Request,
     category_id: int = Path(..., description=HelpTexts.ITEM_PATH_ID_PARAM, ge=1, alias="id"),
-    session: AsyncSession = Depends(get_async_session),
 ) -> SavedCategory:
-
-    category = await category_manager.get_item(field=Category.id, field_value=category_id, session=session)
-    if not category:
+    category_json = await category_manager.get_item_json(category_id, targeted_schema=SavedCategory)
+    if category_json is None:
         raise HTTPException(
             detail=f"Category with id #{category_id} was not found",
             status_code=status.HTTP_404_NOT_FOUND,
         )
 
-    return SavedCategory.from_orm(category)
+    # body is ready, its hash is the cheapest strong validator
+    etag = make_etag(category_json)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    # ready JSON, response_model validation is skipped
+    return json_response(category_json, etag=etag)
 
 
 @router_categories.get("/")
 async def get_categories(
+    request: Request,
     params: Annotated[SearchParams, Depends()],
     session: AsyncSession = Depends(get_async_session),
 ) -> PaginationSavedCategoriesResponse:
     custom_requests_categories_total.inc()
-    result = await category_manager.get_items_paginated(
+    page_json = await category_manager.get_items_paginated_json(
         params=params,
         search_fields=[Category.name],
         targeted_schema=SavedCategory,
+        cache_ttl=settings.LISTING_CACHE_TTL_SECONDS,
         session=session,
     )
-    return result
+    # page comes from listing cache on repeated requests, its hash costs no extra query
+    etag = make_etag(page_json)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    return json_response(page_json, etag=etag)
 
 
 @router_categories.patch(
@@ -234,34 +280,45 @@ async def create_product(
 
 @router_products.get("/")
 async def get_products(
+    request: Request,
     params: Annotated[SearchParams, Depends()],
     session: AsyncSession = Depends(get_async_session),
 ) -> PaginationSavedProductsResponse:
-    if FeatureFlags().should_search_in_description:
+    if feature_flags.should_search_in_description:
         search_fields = [Product.title, Product.description]
     else:
         search_fields = [Product.title]
 
-    result = await product_manager.get_items_paginated(
+    page_json = await product_manager.get_items_paginated_json(
         params=params,
         search_fields=search_fields,
         targeted_schema=SavedProduct,
+        cache_ttl=settings.LISTING_CACHE_TTL_SECONDS,
         session=session,
     )
-    return result
+    # page comes from listing cache on repeated requests, its hash costs no extra query
+    etag = make_etag(page_json)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    return json_response(page_json, etag=etag)
 
 
 @router_products.get("/{id}")
 async def get_product(
+    request: Request,
     product_id: int = Path(..., description=HelpTexts.ITEM_PATH_ID_PARAM, ge=1, alias="id"),
-    session: AsyncSession = Depends(get_async_session),
 ) -> SavedProduct:
-
-    product = await product_manager.get_item(field=Product.id, field_value=product_id, session=session)
-    if not product:
+    product_json = await product_manager.get_item_json(product_id, targeted_schema=SavedProduct)
+    if product_json is None:
         raise HTTPException(
             detail=f"Product with id #{product_id} was not found",
             status_code=status.HTTP_404_NOT_FOUND,
         )
 
-    return SavedProduct.from_orm(product)
+    # body is ready, its hash is the cheapest strong validator
+    etag = make_etag(product_json)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    # ready JSON, response_model validation is skipped
+    return json_response(product_json, etag=etag)
@@ -1,10 +1,16 @@
-import nh3
-from pydantic import BaseModel, Field, field_validator
+from enum import StrEnum
+
+from pydantic import AliasChoices, BaseModel, Field
 
 from applications.base_schemas import BaseCreatedAtField, BaseIdField, PaginationResponse, InstanceVersion
 
 from utils.camel_case import to_camel
-from utils.images import ensure_full_url
+
+
+class ModeChangeOrderProductQuantityEnum(StrEnum):
+    INCREASE = "increase"
+    DECREASE = "decrease"
+    SET = "set"
 
 
 class NewCategory(BaseModel):
@@ -25,35 +31,27 @@ class PaginationSavedCategoriesResponse(PaginationResponse):
 
 
 class SavedProduct(BaseIdField):
-    title: str
-    description: str
+    """
+    ORM object gives write-time columns (Product.get_safe_values), so items are not sanitized on every read.
+    Dicts (cached JSON) have the same keys as response.
+    """
+
+    title: str = Field(validation_alias=AliasChoices("safe_title", "title"), serialization_alias="title")
+    description: str = Field(
+        validation_alias=AliasChoices("safe_description", "description"), serialization_alias="description"
+    )
     price: float
     category_id: int
-    images: list[str]
-    main_image: str
+    images: list[str] = Field(validation_alias=AliasChoices("image_urls", "images"), serialization_alias="images")
+    main_image: str = Field(
+        validation_alias=AliasChoices("main_image_url", "mainImage", "main_image"), serialization_alias="mainImage"
+    )
 
     class Config:
         from_attributes = True
         alias_generator = to_camel
         populate_by_name = True
 
-    @field_validator("images", "main_image", mode="before")
-    @classmethod
-    def validate_images(cls, value):
-
-        if isinstance(value, list):
-            return [ensure_full_url(img) for img in value]
-        return ensure_full_url(value)
-
-    @field_validator("title", "description", mode="before")
-    @classmethod
-    def sanitize_html(cls, v):
-        #  for xss security
-
-        if isinstance(v, str):
-            return nh3.clean(v, tags=set())
-        return v
-
 
 class PaginationSavedProductsResponse(PaginationResponse):
     items: list[SavedProduct]
@@ -103,3 +101,20 @@ class OrderSchema(BaseCreatedAtField):
         self.filter_zero_quantity_products()
         self.order_products.sort(key=lambda item: item.product.id)
         return self
+
+
+class ChangeOrderProductQuantitySchema(BaseModel):
+    product_id: int = Field(ge=1, description="It is Product id, not OrderProduct id")
+    quantity: int = Field(ge=0, default=1)
+    mode: ModeChangeOrderProductQuantityEnum = ModeChangeOrderProductQuantityEnum.INCREASE
+
+    @property
+    def is_set_quantity(self) -> bool:
+        return self.mode == ModeChangeOrderProductQuantityEnum.SET
+
+    @property
+    def quantity_delta(self) -> int:
+        """signed quantity for increase/decrease modes, for set mode - the quantity itself"""
+        if self.mode == ModeChangeOrderProductQuantityEnum.DECREASE:
+            return -self.quantity
+        return self.quantity
@@ -0,0 +1,52 @@
+from applications.users.models import User
+from applications.users.schemas import UserSnapshot
+from services.redis_service import redis_service
+from settings import settings
+from utils.ttl_cache import TTLCache
+
+
+class UserSnapshotCache:
+    """
+    Short living copy of the users row for get_current_user: in process LRU -> Redis -> DB.
+    Is dropped by UserDBManager on every change of the user, so force-logout is applied at once
+    (other workers keep their in process copy not longer than USER_CACHE_LOCAL_TTL_SECONDS).
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self.local = TTLCache(max_size=max_size, ttl=settings.USER_CACHE_LOCAL_TTL_SECONDS)
+
+    @staticmethod
+    def _redis_key(user_id: int) -> str:
+        return f"user:{user_id}:snapshot"
+
+    @staticmethod
+    def to_user(snapshot: UserSnapshot) -> User:
+        """transient User, it is not attached to any session - only for reading"""
+        return User(**snapshot.model_dump())
+
+    async def get(self, user_id: int) -> UserSnapshot | None:
+        snapshot = self.local.get(user_id)
+        if snapshot is not None:
+            return snapshot
+
+        raw = await redis_service.get_cache(self._redis_key(user_id))
+        if not raw:
+            return None
+        snapshot = UserSnapshot.model_validate_json(raw)
+        self.local.set(snapshot.id, snapshot)
+        return snapshot
+
+    async def set(self, user: User) -> UserSnapshot:
+        snapshot = UserSnapshot.model_validate(user)
+        await redis_service.set_cache(
+            self._redis_key(user.id), snapshot.model_dump_json(), ttl=settings.USER_CACHE_TTL_SECONDS
+        )
+        self.local.set(snapshot.id, snapshot)
+        return snapshot
+
+    async def invalidate(self, user_id: int) -> None:
+        self.local.pop(user_id)
+        await redis_service.delete_cache(self._redis_key(user_id))
+
+
+user_cache = UserSnapshotCache()
@@ -6,6 +6,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from applications.auth.password_handler import PasswordEncrypt
 from applications.base_crud import BaseCRUD
+from applications.outbox.crud import outbox_manager
+from applications.outbox.relay import outbox_relay
+from applications.users.cache import user_cache
 from applications.users.models import User
 from applications.users.schemas import UserHashedPassword
 from settings import settings
@@ -26,7 +29,12 @@ class UserDBManager(BaseCRUD):
         is_verified: bool = False,
         is_admin: bool = False,
         notes: str = "",
+        uuid_data: uuid.UUID | None = None,
+        outbox_messages: list[tuple[str, dict]] | None = None,
     ) -> User:
+        """
+        outbox_messages - (queue_name, payload), saved in the same transaction as the user, see applications/outbox
+        """
 
         hashed_password = await PasswordEncrypt.get_password_hash(password)
         user = self.model(
@@ -37,11 +45,17 @@ class UserDBManager(BaseCRUD):
             is_verified=is_verified,
             is_admin=is_admin,
             is_active=is_active,
+            uuid_data=uuid_data or uuid.uuid4(),
         )
         session.add(user)
+        for queue_name, payload in outbox_messages or []:
+            outbox_manager.add_message(session, queue_name=queue_name, payload=payload)
         try:
             await session.commit()
             await session.refresh(user)
+            await self.invalidate_listings()
+            if outbox_messages:
+                outbox_relay.wake_up()
             return user
         except IntegrityError:
             await session.rollback()
@@ -81,8 +95,20 @@ class UserDBManager(BaseCRUD):
         session.add(user)
         await session.commit()
         await session.refresh(user)
+        await user_cache.invalidate(user.id)
         return user
 
+    async def patch_item(self, instance_id: int, **kwargs) -> User:
+        """force-logout and password change go through here too, cached snapshot is dropped after commit"""
+        user = await super().patch_item(instance_id, **kwargs)
+        await user_cache.invalidate(instance_id)
+        return user
+
+    async def delete_item(self, instance_id: int, *, session: AsyncSession) -> bool:
+        deleted = await super().delete_item(instance_id, session=session)
+        await user_cache.invalidate(instance_id)
+        return deleted
+
     async def change_user_password(self, user_id: int, new_password: str, session: AsyncSession):
         hashed_password = await PasswordEncrypt.get_password_hash(new_password)
         schema = UserHashedPassword(hashed_password=hashed_password)
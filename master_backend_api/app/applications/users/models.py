@@ -1,13 +1,18 @@
 from datetime import datetime
-from typing import Optional
+from typing import ClassVar, Optional
 
 import sqlalchemy as sa
 from sqlalchemy.sql import func
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from applications.base_model_and_mixins.base_mixins import CreateUpdateAtMixin, PKMixin, UUIDMixin
+from applications.base_model_and_mixins.base_mixins import (
+    CreateUpdateAtMixin,
+    PKMixin,
+    UUIDMixin,
+    search_vector_column,
+)
 from applications.base_model_and_mixins.base_models import Base
 from constants.permissions import UserPermissionsEnum as UPE
 
@@ -30,7 +35,20 @@ class User(PKMixin, CreateUpdateAtMixin, UUIDMixin, Base):
         default=func.now(), doc="Used to force logout, not allowing token issued before"
     )
 
+    search_weights: ClassVar[dict[str, str]] = {"name": "A", "email": "B"}
+    search_trigram_fields: ClassVar[tuple[str, ...]] = ("name", "email")
+    search_vector: Mapped[str] = search_vector_column(search_weights)
+
     orders = relationship("Order", back_populates="user")
 
+    __table_args__ = (
+        Index("ix_users_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_users_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        # keyset pagination: ORDER BY <SortFields>, id
+        Index("ix_users_updated_at_id", "updated_at", "id"),
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
+
     def __repr__(self) -> str:
         return f"User {self.name} -> #{self.id}"
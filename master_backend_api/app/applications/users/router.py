@@ -20,7 +20,7 @@ from constants.permissions import UserPermissionsEnum
 from dependencies.database import get_async_session
 from dependencies.security import require_permissions, get_current_user
 from services.rabbit.constants import SupportedQueues
-from services.rabbit.rabbitmq_service import rabbitmq_producer
+from utils.responses import json_response
 
 router_users = APIRouter()
 
@@ -38,22 +38,23 @@ async def create_user(
             status_code=status.HTTP_403_FORBIDDEN,
         )
 
+    # uuid is known before INSERT, so the message is saved in the same transaction as the user
+    user_uuid = uuid.uuid4()
+    registration_message = UserRegistrationMessage(
+        user_name=new_user.name,
+        lang="uk",
+        email=new_user.email,
+        base_url=str(request.base_url),
+        redirect_url=str(request.url_for("verify_user", user_uuid=user_uuid)),
+    )
     saved_user = await user_manager.create_user(
         name=new_user.name,
         email=new_user.email,
         password=new_user.password,
+        uuid_data=user_uuid,
+        outbox_messages=[(SupportedQueues.USER_REGISTRATION, registration_message.model_dump(mode="json"))],
         session=session,
     )
-    await rabbitmq_producer.send_message(
-        UserRegistrationMessage(
-            user_name=saved_user.name,
-            lang="uk",
-            email=saved_user.email,
-            base_url=str(request.base_url),
-            redirect_url=str(request.url_for("verify_user", user_uuid=saved_user.uuid_data)),
-        ).dict(),
-        queue_name=SupportedQueues.USER_REGISTRATION,
-    )
     return SavedUser.from_orm(saved_user)
 
 
@@ -88,13 +89,13 @@ async def get_users(
     params: Annotated[SearchParams, Depends()],
     session: AsyncSession = Depends(get_async_session),
 ) -> PaginationSavedUserResponse:
-    result = await user_manager.get_items_paginated(
+    page_json = await user_manager.get_items_paginated_json(
         params=params,
         search_fields=[User.name, User.email],
         targeted_schema=SavedUser,
         session=session,
     )
-    return result
+    return json_response(page_json)
 
 
 @router_users.patch("/{id}")
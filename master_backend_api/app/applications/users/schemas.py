@@ -1,4 +1,8 @@
 import re
+import uuid
+from datetime import datetime
+from typing import Optional
+
 from pydantic import BaseModel, EmailStr, Field, model_validator, constr
 
 from applications.base_schemas import BaseCreatedAtField, BaseIdField, PaginationResponse
@@ -70,3 +74,24 @@ class UserRegistrationMessage(BaseModel):
 
 class UserHashedPassword(BaseModel):
     hashed_password: str
+
+
+class UserSnapshot(BaseModel):
+    """users row without hashed_password, stored in cache for get_current_user"""
+
+    id: int
+    name: str
+    email: str
+    is_active: bool
+    is_verified: bool
+    is_admin: bool
+    notes: Optional[str] = None
+    permissions: list[str]
+    metadata_info: dict
+    use_token_since: datetime
+    created_at: datetime
+    updated_at: datetime
+    uuid_data: uuid.UUID
+
+    class Config:
+        from_attributes = True
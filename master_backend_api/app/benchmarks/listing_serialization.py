@@ -0,0 +1,93 @@
+"""
+CPU cost of products listing serialization: sanitize on read (nh3 + urlparse per item) vs write-time columns.
+
+Database is not needed, products are transient ORM instances, one page is serialized as the router does it.
+
+Run inside master-backend-api container:
+    python -m benchmarks.listing_serialization --items 50 --repeats 200
+"""
+
+import argparse
+import statistics
+import time
+
+import nh3
+from pydantic import field_validator
+
+import main  # noqa: F401 - configures all mappers
+from applications.base_schemas import PaginationResponse
+from applications.products.models import Product
+from applications.products.schemas import SavedProduct
+from utils.images import ensure_full_url
+
+DESCRIPTION = "<p>Ноутбук <b>Lenovo</b> IdeaPad Slim 5 16IRL8 <script>alert(1)</script></p> " * 8
+
+
+class SanitizeOnReadProduct(SavedProduct):
+    """SavedProduct as it was before write-time columns"""
+
+    @field_validator("images", "main_image", mode="before")
+    @classmethod
+    def validate_images(cls, value):
+        if isinstance(value, list):
+            return [ensure_full_url(img) for img in value]
+        return ensure_full_url(value)
+
+    @field_validator("title", "description", mode="before")
+    @classmethod
+    def sanitize_html(cls, v):
+        if isinstance(v, str):
+            return nh3.clean(v, tags=set())
+        return v
+
+
+def make_products(items: int, with_safe_values: bool) -> list[Product]:
+    products = []
+    for i in range(1, items + 1):
+        product = Product(
+            id=i,
+            title=f"<i>Ноутбук</i> Lenovo IdeaPad #{i}",
+            description=DESCRIPTION,
+            price=100.0 + i,
+            category_id=1,
+            images=[f"productImages/{i}/{n}.png" for n in range(4)],
+            main_image=f"productImages/{i}/main.png",
+        )
+        if with_safe_values:
+            product.fill_safe_values()
+        else:
+            # old rows: only source columns, schema cleans them itself
+            product.safe_title, product.safe_description = product.title, product.description
+            product.image_urls, product.main_image_url = product.images, product.main_image
+        products.append(product)
+    return products
+
+
+def measure(schema: type[SavedProduct], products: list[Product], repeats: int) -> list[float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        page = PaginationResponse(items=[schema.from_orm(product) for product in products], page=1, limit=len(products))
+        page.model_dump_json(by_alias=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main_benchmark(items: int, repeats: int) -> None:
+    print(f"{'path':<20}{'p50, ms':>10}{'p95, ms':>10}")
+    for name, schema, with_safe_values in (
+        ("sanitize on read", SanitizeOnReadProduct, False),
+        ("write-time columns", SavedProduct, True),
+    ):
+        products = make_products(items, with_safe_values)
+        timings = sorted(measure(schema, products, repeats))
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        print(f"{name:<20}{statistics.median(timings):>10.2f}{p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50, help="items per page")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+    main_benchmark(args.items, args.repeats)
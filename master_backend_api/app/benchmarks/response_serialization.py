@@ -0,0 +1,137 @@
+"""
+CPU time of one listing page response: FastAPI response_model path vs ready JSON (utils/responses.py).
+
+    response_model  - pydantic model per row, page is re-validated by response_model, then stdlib json.dumps
+    dump_page       - rows are dumped by orjson (utils/fast_json.py), router returns the body as is
+    cached, parsed  - cached JSON was parsed and validated again before response_model (previous cache hit)
+    cached, as is   - cached JSON is returned as is (current cache hit)
+
+Both ways must give the same JSON, it is checked before measuring.
+
+Database is not needed, rows are transient ORM instances.
+
+Run inside master-backend-api container:
+    python -m benchmarks.response_serialization --items 50 --repeats 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+import main  # noqa: F401 - configures all mappers
+from applications.base_schemas import PaginationResponse
+from applications.products.models import Category, Product
+from applications.products.routers import router_categories, router_products
+from applications.products.schemas import SavedCategory, SavedProduct
+from applications.users.models import User
+from applications.users.router import router_users
+from applications.users.schemas import SavedUser
+from utils.fast_json import dump_page
+
+
+def make_products(items: int) -> list[Product]:
+    products = []
+    for i in range(1, items + 1):
+        product = Product(
+            id=i,
+            title=f"Ноутбук Lenovo IdeaPad #{i}",
+            description="Ноутбук Lenovo IdeaPad Slim 5 16IRL8 " * 8,
+            price=100.0 + i,
+            category_id=1,
+            images=[f"productImages/{i}/{n}.png" for n in range(4)],
+            main_image=f"productImages/{i}/main.png",
+        )
+        product.fill_safe_values()
+        products.append(product)
+    return products
+
+
+def make_categories(items: int) -> list[Category]:
+    return [Category(id=i, name=f"category {i}", version=1, created_at=datetime.now()) for i in range(1, items + 1)]
+
+
+def make_users(items: int) -> list[User]:
+    return [
+        User(
+            id=i,
+            name="John Doe",
+            email=f"user{i}@example.com",
+            is_active=True,
+            is_admin=False,
+            created_at=datetime.now(),
+        )
+        for i in range(1, items + 1)
+    ]
+
+
+def get_response_field(router, path: str):
+    for route in router.routes:
+        if isinstance(route, APIRoute) and route.path == path and "GET" in route.methods:
+            return route.response_field
+    raise LookupError(path)
+
+
+def make_page(schema, items) -> PaginationResponse:
+    return PaginationResponse(items=[schema.from_orm(item) for item in items], page=1, limit=len(items))
+
+
+async def measure(fn, repeats: int) -> list[float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.process_time()
+        await fn()
+        timings.append((time.process_time() - start) * 1000)
+    return timings
+
+
+async def main_benchmark(items: int, repeats: int) -> None:
+    cases = (
+        ("products", router_products, SavedProduct, make_products(items)),
+        ("categories", router_categories, SavedCategory, make_categories(items)),
+        ("users", router_users, SavedUser, make_users(items)),
+    )
+    print(f"{'listing':<12}{'path':<18}{'p50, ms':>10}{'p95, ms':>10}")
+    page_info = dict(total=None, page=1, limit=items, pages=None, has_next=False, next_cursor=None, prev_cursor=None)
+    for name, router, schema, rows in cases:
+        field = get_response_field(router, "/")
+        cached_page = dump_page(schema, rows, page_info)
+
+        async def response_model_path():
+            content = await serialize_response(field=field, response_content=make_page(schema, rows))
+            return JSONResponse(content).body
+
+        async def dump_page_path():
+            return dump_page(schema, rows, page_info)
+
+        async def cached_parsed_path():
+            page = PaginationResponse.model_validate_json(cached_page)
+            return JSONResponse(await serialize_response(field=field, response_content=page)).body
+
+        async def cached_as_is_path():
+            return cached_page
+
+        assert orjson.loads(await response_model_path()) == orjson.loads(await dump_page_path()), name
+
+        for path, fn in (
+            ("response_model", response_model_path),
+            ("dump_page", dump_page_path),
+            ("cached, parsed", cached_parsed_path),
+            ("cached, as is", cached_as_is_path),
+        ):
+            timings = sorted(await measure(fn, repeats))
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{name:<12}{path:<18}{statistics.median(timings):>10.3f}{p95:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50, help="items per page")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main_benchmark(args.items, args.repeats))
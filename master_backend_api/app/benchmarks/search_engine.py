@@ -0,0 +1,112 @@
+"""
+Latency of product search: current ILIKE path vs fulltext (tsvector + pg_trgm).
+
+Data is generated in a separate "benchmark" schema, public tables are not touched.
+Queries are built by product_manager itself (schema_translate_map), so the real code path is measured.
+
+Run inside master-backend-api container:
+    python -m benchmarks.search_engine --rows 1000000 --repeats 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from applications.base_model_and_mixins.base_models import engine
+from applications.base_queries import SearchEngineEnum, SearchParams
+from applications.products.crud import product_manager
+from applications.products.models import Product
+from applications.products.schemas import SavedProduct
+
+SCHEMA = "benchmark"
+
+SCHEMA_SQL = (
+    f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE",
+    f"CREATE SCHEMA {SCHEMA}",
+    # INCLUDING ALL copies generated search_vector column and GIN indexes
+    f"CREATE TABLE {SCHEMA}.products (LIKE public.products INCLUDING ALL)",
+)
+
+INSERT_SQL = f"""
+    INSERT INTO {SCHEMA}.products
+        (id, title, price, description, images, main_image, category_id, created_at, updated_at, uuid_data,
+         safe_title, safe_description, image_urls, main_image_url)
+    SELECT *, title, description, images, main_image
+    FROM (
+        SELECT
+            i AS id,
+            (ARRAY['Ноутбук', 'Смартфон', 'Монітор', 'Камера', 'Laptop', 'Phone', 'Tablet', 'Навушники'])
+                [1 + floor(random() * 8)::int]
+            || ' ' || (ARRAY['Lenovo', 'Apple', 'Samsung', 'Asus', 'Xiaomi', 'Dell', 'Sony', 'Acer'])
+                [1 + floor(random() * 8)::int]
+            || ' ' || (ARRAY['IdeaPad', 'Galaxy', 'ZenBook', 'Redmi', 'XPS', 'Bravia', 'Aspire', 'Slim'])
+                [1 + floor(random() * 8)::int]
+            || ' ' || substr(md5(i::text), 1, 6) AS title,
+            round((random() * 100000)::numeric, 2) AS price,
+            repeat(md5(random()::text) || ' ', 10) AS description,
+            '{{}}'::varchar[] AS images,
+            'productImages/benchmark.png' AS main_image,
+            1 AS category_id,
+            now() AS created_at,
+            now() AS updated_at,
+            gen_random_uuid() AS uuid_data
+        FROM generate_series(1, :rows) AS i
+    ) AS generated
+"""
+
+QUERIES = ("Ноутбук Lenovo", "ideapad slim", "Lenvo", "Galaxy 3f2")
+
+
+async def seed(rows: int) -> None:
+    async with engine.begin() as connection:
+        for statement in SCHEMA_SQL:
+            await connection.execute(text(statement))
+        await connection.execute(text(INSERT_SQL), {"rows": rows})
+        await connection.execute(text(f"ANALYZE {SCHEMA}.products"))
+
+
+async def measure(session_maker: async_sessionmaker, params: SearchParams, repeats: int) -> list[float]:
+    timings = []
+    async with session_maker() as session:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            await product_manager.get_items_paginated(
+                params=params,
+                search_fields=[Product.title, Product.description],
+                targeted_schema=SavedProduct,
+                session=session,
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+async def main(rows: int, repeats: int, skip_seed: bool) -> None:
+    if not skip_seed:
+        print(f"Seeding {rows} products into schema '{SCHEMA}'...")
+        await seed(rows)
+
+    benchmark_engine = engine.execution_options(schema_translate_map={None: SCHEMA})
+    session_maker = async_sessionmaker(benchmark_engine, expire_on_commit=False)
+
+    print(f"{'query':<20}{'engine':<12}{'p50, ms':>10}{'p95, ms':>10}")
+    for q in QUERIES:
+        for search_engine in SearchEngineEnum:
+            params = SearchParams(q=q, limit=8, search_engine=search_engine)
+            timings = sorted(await measure(session_maker, params, repeats))
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{q:<20}{search_engine:<12}{statistics.median(timings):>10.1f}{p95:>10.1f}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse data from the previous run")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeats, args.skip_seed))
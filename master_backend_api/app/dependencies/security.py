@@ -5,6 +5,7 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from applications.auth.auth_handler import AuthHandler
+from applications.users.cache import user_cache
 from applications.users.crud import user_manager
 from applications.users.models import User
 from dependencies.database import get_async_session
@@ -18,16 +19,24 @@ async def get_current_user(
     token: str = Depends(SecurityHandler.oauth2_scheme),
     session: AsyncSession = Depends(get_async_session),
 ) -> User | None:
+    """DB is queried only on cache miss, returned User is not attached to the session"""
     payload = await AuthHandler().decode_token(token)
+    user_id = int(payload["sub"])
 
-    user = await user_manager.get_item(field=User.email, field_value=payload.get("email"), session=session)
+    snapshot = await user_cache.get(user_id)
+    if not snapshot:
+        user = await user_manager.get_item(field=User.id, field_value=user_id, session=session)
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        snapshot = await user_cache.set(user)
 
-    if not user:
+    # token is bound to email as before, changed email makes old tokens invalid
+    if snapshot.email != payload.get("email"):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
-    if user.use_token_since > payload["iat"]:
+    if snapshot.use_token_since > payload["iat"]:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User forced logout")
-    return user
+    return user_cache.to_user(snapshot)
 
 
 async def get_admin_user(user: User | None = Depends(get_current_user)) -> User:
@@ -1,23 +1,87 @@
 # https://www.flagsmith.com/
-from enum import StrEnum
+import asyncio
 import json
+import logging
+from enum import StrEnum
 
 from flagsmith import Flagsmith
+from flagsmith.models import Flags
+from flagsmith.offline_handlers import LocalFileHandler
 
 from settings import settings
 
+logger = logging.getLogger(__name__)
+
 
 class Features(StrEnum):
     SEARCH_PRODUCT_IN_DESCRIPTION = "search_product_in_description"
 
 
 class FeatureFlags:
+    """
+    One client per process, started in lifespan.
+    Request path reads only the last evaluated flags - no HTTP to Flagsmith per request.
+    Flags are re-evaluated in background task, if Flagsmith is unreachable - previous (stale) flags are served.
+    """
+
     def __init__(self):
-        self.service = Flagsmith(environment_key=settings.FLAGSMITH_API_KEY)
-        self.flags = self.service.get_environment_flags()
+        self.service: Flagsmith | None = None
+        self.flags: Flags | None = None
+        self._refresh_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _build_service() -> Flagsmith | None:
+        if settings.FLAGSMITH_OFFLINE_FILE:
+            # environment document saved from Flagsmith API - for tests and local runs without network
+            return Flagsmith(offline_mode=True, offline_handler=LocalFileHandler(settings.FLAGSMITH_OFFLINE_FILE))
+        if not settings.FLAGSMITH_API_KEY:
+            return None
+        # server-side key allows to evaluate flags locally from environment document, SDK polls it in its thread
+        return Flagsmith(
+            environment_key=settings.FLAGSMITH_API_KEY,
+            enable_local_evaluation=settings.FLAGSMITH_API_KEY.startswith("ser."),
+            environment_refresh_interval_seconds=settings.FLAGSMITH_REFRESH_INTERVAL_SECONDS,
+        )
+
+    async def start(self) -> None:
+        try:
+            self.service = await asyncio.to_thread(self._build_service)
+        except Exception:
+            logger.exception("Flagsmith client was not created, default flags are used")
+            return
+        if self.service is None:
+            return
+        await self.refresh()
+        self._refresh_task = asyncio.create_task(self._refresh_forever())
+
+    async def stop(self) -> None:
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+        polling_thread = getattr(self.service, "environment_data_polling_manager_thread", None)
+        if polling_thread:
+            polling_thread.stop()
+        self.service = None
+
+    async def refresh(self) -> None:
+        try:
+            self.flags = await asyncio.to_thread(self.service.get_environment_flags)
+        except Exception:
+            logger.warning("Flagsmith flags were not refreshed, previous values are used", exc_info=True)
+
+    async def _refresh_forever(self) -> None:
+        while True:
+            await asyncio.sleep(settings.FLAGSMITH_REFRESH_INTERVAL_SECONDS)
+            await self.refresh()
 
     @property
     def should_search_in_description(self) -> bool:
+        if self.flags is None:
+            return False
         is_feature_enabled = self.flags.is_feature_enabled(Features.SEARCH_PRODUCT_IN_DESCRIPTION)
         if is_feature_enabled:
             feature_content = self.flags.get_feature_value(Features.SEARCH_PRODUCT_IN_DESCRIPTION)
@@ -25,3 +89,6 @@ class FeatureFlags:
             if details["enabled"]:
                 return True
         return False
+
+
+feature_flags = FeatureFlags()
@@ -40,11 +40,28 @@ sentry_sdk.init(
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    from applications.auth.password_handler import PasswordEncrypt
+    from applications.outbox.relay import outbox_relay
+    from applications.products.cache import catalog_cache
     from applications.users.crud import user_manager
-
+    from features_flags.feature_flags import feature_flags
+    from services.rabbit.rabbitmq_service import rabbitmq_producer
+    from services.redis_service import redis_service
+
+    redis_service.start()
+    catalog_cache.start_listener()
+    await feature_flags.start()
+    await rabbitmq_producer.start()
+    outbox_relay.start()
     session = await get_async_session_instance()
     await user_manager.create_admin(session=session)
     yield
+    await outbox_relay.stop()
+    await rabbitmq_producer.close()
+    await feature_flags.stop()
+    await catalog_cache.stop_listener()
+    await redis_service.close()
+    PasswordEncrypt.shutdown()
 
 
 def get_application() -> FastAPI:
@@ -0,0 +1,33 @@
+"""one open order per user
+
+Revision ID: 1b5755ebb554
+Revises: 1bdb4dcd6594
+Create Date: 2026-10-18 10:47:03.512846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b5755ebb554'
+down_revision: Union[str, None] = '1bdb4dcd6594'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # duplicated open orders could be created only by the get_or_create race, the newest one is used as a cart
+    op.execute(
+        """
+        UPDATE orders SET is_closed = true
+        WHERE NOT is_closed AND id NOT IN (SELECT max(id) FROM orders WHERE NOT is_closed GROUP BY user_id)
+        """
+    )
+    op.create_index('uq_orders_user_id_open', 'orders', ['user_id'], unique=True, postgresql_where=sa.text('NOT is_closed'))
+
+
+def downgrade() -> None:
+    op.drop_index('uq_orders_user_id_open', table_name='orders', postgresql_where=sa.text('NOT is_closed'))
@@ -0,0 +1,83 @@
+"""product safe columns
+
+Revision ID: dba1351c54ce
+Revises: 1b5755ebb554
+Create Date: 2026-10-18 11:30:12.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import nh3
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from utils.images import ensure_full_url
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'dba1351c54ce'
+down_revision: Union[str, None] = '1b5755ebb554'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+products = sa.table(
+    'products',
+    sa.column('id', sa.Integer),
+    sa.column('title', sa.String),
+    sa.column('description', sa.String),
+    sa.column('images', postgresql.ARRAY(sa.String)),
+    sa.column('main_image', sa.String),
+    sa.column('safe_title', sa.String),
+    sa.column('safe_description', sa.String),
+    sa.column('image_urls', postgresql.ARRAY(sa.String)),
+    sa.column('main_image_url', sa.String),
+)
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('safe_title', sa.String(), nullable=True))
+    op.add_column('products', sa.Column('safe_description', sa.String(), nullable=True))
+    op.add_column('products', sa.Column('image_urls', postgresql.ARRAY(sa.String()), nullable=True))
+    op.add_column('products', sa.Column('main_image_url', sa.String(), nullable=True))
+
+    # the same cleaning as Product.get_safe_values, it is done in python (nh3), so rows are processed by batches
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(products.c.id, products.c.title, products.c.description, products.c.images, products.c.main_image)
+            .where(products.c.id > last_id)
+            .order_by(products.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        connection.execute(
+            products.update().where(products.c.id == sa.bindparam('row_id')),
+            [
+                {
+                    'row_id': row.id,
+                    'safe_title': nh3.clean(row.title or '', tags=set()),
+                    'safe_description': nh3.clean(row.description or '', tags=set()),
+                    'image_urls': [ensure_full_url(image) for image in row.images or []],
+                    'main_image_url': ensure_full_url(row.main_image),
+                }
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+    op.alter_column('products', 'safe_title', nullable=False)
+    op.alter_column('products', 'safe_description', nullable=False)
+    op.alter_column('products', 'image_urls', nullable=False)
+    op.alter_column('products', 'main_image_url', nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('products', 'main_image_url')
+    op.drop_column('products', 'image_urls')
+    op.drop_column('products', 'safe_description')
+    op.drop_column('products', 'safe_title')
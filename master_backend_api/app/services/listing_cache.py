@@ -0,0 +1,108 @@
+import hashlib
+import json
+import logging
+import secrets
+
+from prometheus_client import Counter
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+from sqlalchemy.orm import InstrumentedAttribute
+
+from applications.base_queries import PaginationModeEnum, SearchParams
+from services.redis_service import redis_service
+
+logger = logging.getLogger(__name__)
+
+listing_cache_requests_total = Counter(
+    "listing_cache_requests_total", "Lookups of paginated listings in cache", ["table", "result"]
+)
+listing_cache_errors_total = Counter(
+    "listing_cache_errors_total", "Redis errors of listing cache, the request goes on without it", ["operation"]
+)
+
+# generation and page are read in one round trip.
+# Missing generation (evicted, flushed) is seeded with a random epoch, not 0 -
+# pages cached under the previous generations must not become reachable again.
+GET_PAGE_SCRIPT = """
+local generation = redis.call('GET', KEYS[1])
+if not generation then
+    generation = ARGV[3]
+    redis.call('SET', KEYS[1], generation)
+end
+local page_key = ARGV[1] .. generation .. ':' .. ARGV[2]
+return {page_key, redis.call('GET', page_key)}
+"""
+
+
+class ListingCache:
+    """
+    Serialized PaginationResponse pages in Redis, tagged by table.
+    Page key contains current generation of the table, any write bumps it (INCR),
+    so all cached pages of the table become unreachable at once without SCAN/DEL and expire by ttl.
+    Redis errors are logged and counted, listing is read from DB then.
+    """
+
+    @staticmethod
+    def _generation_key(table: str) -> str:
+        return f"listing:{table}:generation"
+
+    @staticmethod
+    def fingerprint(
+        params: SearchParams, search_fields: list[InstrumentedAttribute] | None, targeted_schema: type[BaseModel]
+    ) -> str:
+        """the same listing for differently written requests gives the same fingerprint"""
+        data = params.model_dump(mode="json")
+        if data["q"]:
+            # all search engines are case insensitive and split q by whitespaces
+            data["q"] = " ".join(data["q"].lower().split())
+        else:
+            data.pop("search_engine")
+            data.pop("use_sharp_filter")
+        if params.pagination_mode == PaginationModeEnum.CURSOR:
+            data.pop("page")
+        else:
+            data.pop("cursor")
+        if not params.with_total:
+            data.pop("total_mode")
+
+        data["search_fields"] = [field.key for field in search_fields or []]
+        data["schema"] = targeted_schema.__name__
+        return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+    async def get(self, table: str, fingerprint: str) -> tuple[str | None, str | None]:
+        """returns key to store the page with and cached page (None on miss), (None, None) - Redis is not available"""
+        try:
+            async with redis_service.get_redis() as redis:
+                page_key, raw = await redis.eval(
+                    GET_PAGE_SCRIPT,
+                    1,
+                    self._generation_key(table),
+                    f"listing:{table}:",
+                    fingerprint,
+                    secrets.randbits(48),
+                )
+        except RedisError:
+            logger.warning("Listing cache of %s is not available, reading from DB", table, exc_info=True)
+            listing_cache_errors_total.labels("get").inc()
+            return None, None
+        listing_cache_requests_total.labels(table, "hit" if raw is not None else "miss").inc()
+        return page_key, raw
+
+    async def set(self, page_key: str, page_json: str | bytes, ttl: int) -> None:
+        try:
+            await redis_service.set_cache(page_key, page_json, ttl=ttl)
+        except RedisError:
+            logger.warning("Listing page %s was not cached", page_key, exc_info=True)
+            listing_cache_errors_total.labels("set").inc()
+
+    async def bump_generation(self, table: str) -> None:
+        """is called after commit, so failure is not raised - the write is done, stale pages expire by ttl"""
+        try:
+            async with redis_service.get_redis() as redis:
+                await redis.incr(self._generation_key(table))
+        except RedisError:
+            logger.error("Listing cache generation of %s was not bumped", table, exc_info=True)
+            listing_cache_errors_total.labels("bump_generation").inc()
+
+
+listing_cache = ListingCache()
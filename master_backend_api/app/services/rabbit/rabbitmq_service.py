@@ -1,25 +1,102 @@
+import asyncio
 import json
+import time
 
 import aio_pika
+from aio_pika.abc import AbstractChannel, AbstractRobustConnection
+from aio_pika.pool import Pool
+from prometheus_client import Counter, Histogram
 
+from services.rabbit.constants import SupportedQueues
 from settings import settings
 
+rabbitmq_publish_latency = Histogram(
+    "rabbitmq_publish_latency_seconds",
+    "From publish call to broker confirm (ack) of the message",
+    ["queue"],
+)
+rabbitmq_published_messages_total = Counter(
+    "rabbitmq_published_messages_total",
+    "Published messages by result: ack, nack (caller retries them)",
+    ["queue", "result"],
+)
+
 
 class RabbitMQProducer:
+    """
+    One robust connection per process (reconnects itself), started in lifespan.
+    publish sends a batch on a pooled channel and waits for all publisher confirms at once.
+    Messages are not kept here - caller keeps not confirmed ones and retries them (outbox relay).
+    """
+
     def __init__(self):
         self.rabbitmq_url = settings.RABBITMQ_URL
+        self.connection: AbstractRobustConnection | None = None
+        self.channel_pool: Pool | None = None
+        self._declared_queues: set[str] = set()
+        self._connection_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        if self.channel_pool is not None:
+            return
+        # connection is opened by the first batch, so unavailable broker does not stop the application start
+        self.channel_pool = Pool(self._get_channel, max_size=settings.RABBITMQ_CHANNEL_POOL_SIZE)
+
+    async def close(self) -> None:
+        if self.channel_pool:
+            await self.channel_pool.close()
+        if self.connection:
+            await self.connection.close()
+        self.channel_pool = self.connection = None
+        self._declared_queues.clear()
+
+    async def publish(self, messages: list[tuple[str, dict]]) -> list[bool]:
+        """
+        Returns confirmed flag for every message.
+        Raises if the broker is not reachable - nothing is confirmed then.
+        """
+        if self.channel_pool is None:
+            # scripts without lifespan
+            await self.start()
+        batch = [(queue_name, json.dumps(message).encode(), time.monotonic()) for queue_name, message in messages]
+        not_confirmed = {id(item) for item in await self._publish_batch(batch)}
+        return [id(item) not in not_confirmed for item in batch]
+
+    async def _get_channel(self) -> AbstractChannel:
+        async with self._connection_lock:
+            if self.connection is None:
+                self.connection = await aio_pika.connect_robust(self.rabbitmq_url)
+        return await self.connection.channel(publisher_confirms=True)
+
+    async def _declare_queues(self, channel: AbstractChannel, queue_names: set[str]) -> None:
+        """durable queue is declared once per process, robust channels redeclare it after reconnect themselves"""
+        for queue_name in queue_names - self._declared_queues:
+            await channel.declare_queue(queue_name, durable=True)
+            self._declared_queues.add(queue_name)
+
+    async def _publish_batch(self, batch: list[tuple[str, bytes, float]]) -> list[tuple[str, bytes, float]]:
+        """returns messages which were not confirmed"""
+        async with self.channel_pool.acquire() as channel:
+            await self._declare_queues(channel, {*SupportedQueues.get_queues(), *(item[0] for item in batch)})
+            confirms = [
+                channel.default_exchange.publish(
+                    aio_pika.Message(body=body, delivery_mode=aio_pika.DeliveryMode.PERSISTENT),
+                    routing_key=queue_name,
+                )
+                for queue_name, body, _ in batch
+            ]
+            results = await asyncio.gather(*confirms, return_exceptions=True)
 
-    async def send_message(self, message: dict, queue_name: str):
-        connection = await aio_pika.connect_robust(self.rabbitmq_url)
-        async with connection:
-            channel = await connection.channel()
-            queue = await channel.declare_queue(queue_name, durable=True)
-
-            message_json = json.dumps(message)
-            await channel.default_exchange.publish(
-                aio_pika.Message(body=message_json.encode()),
-                routing_key=queue.name,
-            )
+        not_confirmed = []
+        for item, result in zip(batch, results):
+            queue_name, _, enqueued_at = item
+            if isinstance(result, BaseException):
+                rabbitmq_published_messages_total.labels(queue_name, "nack").inc()
+                not_confirmed.append(item)
+            else:
+                rabbitmq_published_messages_total.labels(queue_name, "ack").inc()
+                rabbitmq_publish_latency.labels(queue_name).observe(time.monotonic() - enqueued_at)
+        return not_confirmed
 
 
 rabbitmq_producer = RabbitMQProducer()
@@ -2,22 +2,69 @@ from contextlib import asynccontextmanager
 from datetime import timedelta
 
 import redis.asyncio as redis
+from prometheus_client import Gauge
 
 from settings import settings
 
+redis_pool_in_use = Gauge("redis_pool_connections_in_use", "Redis connections taken from the pool")
+redis_pool_idle = Gauge("redis_pool_connections_idle", "Open Redis connections waiting in the pool")
+redis_pool_max = Gauge("redis_pool_connections_max", "Redis pool size limit")
+
 
 class RedisService:
     def __init__(self):
         self.redis_url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}"
         self.db = 0
-        self.redis = redis.from_url(self.redis_url, db=self.db, decode_responses=True)
+        self.pool: redis.BlockingConnectionPool | None = None
+        self._redis: redis.Redis | None = None
+
+    def start(self) -> None:
+        """
+        Створює довгоживучий пул з'єднань, викликається в lifespan.
+        Коли пул заповнений - команда чекає на вільне з'єднання REDIS_POOL_TIMEOUT_SECONDS, а не відкриває нове.
+        """
+        if self._redis is not None:
+            return
+
+        self.pool = redis.BlockingConnectionPool.from_url(
+            self.redis_url,
+            db=self.db,
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            timeout=settings.REDIS_POOL_TIMEOUT_SECONDS,
+            health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+            socket_keepalive=True,
+            socket_connect_timeout=5,
+            retry_on_timeout=True,
+        )
+        self._redis = redis.Redis(connection_pool=self.pool)
+
+        redis_pool_in_use.set_function(lambda: len(self.pool._in_use_connections))
+        redis_pool_idle.set_function(lambda: len(self.pool._available_connections))
+        redis_pool_max.set(self.pool.max_connections)
+
+    async def close(self) -> None:
+        """Закриває всі з'єднання пулу, викликається при зупинці застосунку."""
+        if self._redis is None:
+            return
+        await self._redis.aclose()
+        await self.pool.disconnect()
+        self._redis = None
+        self.pool = None
+
+    @property
+    def redis(self) -> redis.Redis:
+        # скрипти і воркери без lifespan отримують пул при першому зверненні
+        if self._redis is None:
+            self.start()
+        return self._redis
 
     @asynccontextmanager
     async def get_redis(self):
         """
         Контекстний менеджер для роботи з Redis.
 
-        Використовується для автоматичного закриття підключення після виконання операцій.
+        З'єднання береться з пулу на час команди і повертається назад, клієнт не закривається.
 
         Приклад використання:
         ```python
@@ -25,10 +72,27 @@ class RedisService:
             await redis.hset('users:1234', 'name', 'Alex')
         ```
         """
-        try:
-            yield self.redis
-        finally:
-            await self.redis.close()
+        yield self.redis
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = True):
+        """
+        Накопичує команди і відправляє їх одним запитом при виході з блоку (MULTI/EXEC, якщо transaction=True).
+
+        Команди пайплайна не потрібно await-ити. Якщо потрібні результати - викличте `await p.execute()`
+        всередині блоку, тоді при виході нічого повторно не відправляється.
+
+        Приклад використання:
+        ```python
+        async with redis_service.pipeline() as p:
+            p.hset('users:1234', 'name', 'Alex')
+            p.expire('users:1234', 60)
+        ```
+        """
+        async with self.redis.pipeline(transaction=transaction) as pipe:
+            yield pipe
+            if pipe.command_stack:
+                await pipe.execute()
 
     async def hset(self, key: str, field: str, value: str, ttl: int = 60 * 60 * 24 * 90):
         """
@@ -46,9 +110,23 @@ class RedisService:
             await redis_service.hset('users:1234', 'name', 'Alex')
         ```
         """
-        async with self.get_redis() as redis:
-            await redis.hset(key, field, value)
-            await redis.expire(key, ttl)
+        async with self.pipeline() as p:
+            p.hset(key, field, value)
+            p.expire(key, ttl)
+
+    async def hset_many(self, key: str, mapping: dict[str, str], ttl: int | None = None):
+        """
+        Встановлює кілька полів хешу і TTL за один запит.
+
+        Args:
+            key (str): Ключ хешу.
+            mapping (dict): Поля та значення.
+            ttl (int, optional): Час життя ключа в секундах.
+        """
+        async with self.pipeline() as p:
+            p.hset(key, mapping=mapping)
+            if ttl is not None:
+                p.expire(key, ttl)
 
     async def hdel(self, key: str, field: str):
         """
@@ -146,6 +224,32 @@ class RedisService:
         async with self.get_redis() as redis:
             return await redis.get(key)
 
+    async def consume_cache(self, key: str):
+        """
+        Атомарно отримує і видаляє значення (GETDEL), для одноразових токенів.
+        З двох одночасних запитів з тим самим ключем значення отримає лише один.
+
+        Args:
+            key (str): Ключ кешу.
+
+        Returns:
+            str: Значення або None, якщо ключа вже немає.
+        """
+        async with self.get_redis() as redis:
+            return await redis.getdel(key)
+
+    async def mget_cache(self, keys: list[str]) -> list[str | None]:
+        """
+        Отримує кілька кешованих значень одним запитом MGET.
+
+        Returns:
+            list: Значення в порядку ключів, None для відсутніх.
+        """
+        if not keys:
+            return []
+        async with self.get_redis() as redis:
+            return await redis.mget(keys)
+
     async def delete_cache(self, key: str):
         """
         Видаляє кеш з Redis за вказаним ключем.
@@ -171,10 +275,10 @@ class RedisService:
             value (str): Значення для додавання.
             ttl (int, optional): Час життя списку в секундах.
         """
-        async with self.get_redis() as redis:
-            await redis.lpush(key, value)
+        async with self.pipeline() as p:
+            p.lpush(key, value)
             if ttl is not None:
-                await redis.expire(key, ttl)
+                p.expire(key, ttl)
 
     async def rpush(self, key: str, value: str):
         """Додає значення в кінець списку."""
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import secrets
+import time
+from contextlib import suppress
+from typing import Awaitable, Callable, TypeVar
+
+from prometheus_client import Counter, Gauge
+from redis.exceptions import RedisError
+
+from services.redis_service import redis_service
+from settings import settings
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+single_flight_calls_total = Counter(
+    "single_flight_calls_total",
+    "Reads by role: leader executes the query, waiter/remote_waiter get result of another in-flight read",
+    ["name", "role"],
+)
+single_flight_in_flight = Gauge("single_flight_in_flight", "Shared reads being executed now", ["name"])
+
+# lock expires after SINGLE_FLIGHT_LOCK_TIMEOUT_MS, so a slow leader must not delete the lock of the next one
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one execution of fn (per worker).
+    fn is executed in a separate task, so cancellation of the first caller does not break the others.
+    Result is shared between requests - fn must use its own DB session and return immutable data.
+
+    With SINGLE_FLIGHT_REDIS_LOCK and wait_for only one worker executes fn, others poll wait_for
+    (reading of the cache fn fills, None - not ready) while the lock is held, up to SINGLE_FLIGHT_LOCK_TIMEOUT_MS,
+    and then execute fn themselves. Without Redis every worker executes fn.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[str, asyncio.Task] = {}
+
+    async def do(
+        self, key: str, fn: Callable[[], Awaitable[T]], wait_for: Callable[[], Awaitable[T | None]] | None = None
+    ) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            single_flight_calls_total.labels(self.name, "leader").inc()
+            task = asyncio.create_task(self._run(key, fn, wait_for))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            single_flight_calls_total.labels(self.name, "waiter").inc()
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # all callers could be cancelled, exception is retrieved to avoid "never retrieved" warning
+            task.exception()
+
+    async def _run(
+        self, key: str, fn: Callable[[], Awaitable[T]], wait_for: Callable[[], Awaitable[T | None]] | None
+    ) -> T:
+        with single_flight_in_flight.labels(self.name).track_inprogress():
+            if wait_for is None or not settings.SINGLE_FLIGHT_REDIS_LOCK:
+                return await fn()
+
+            lock_key = f"single_flight:{self.name}:{key}"
+            timeout_ms = settings.SINGLE_FLIGHT_LOCK_TIMEOUT_MS
+            token = secrets.token_hex(16)
+            acquired = False
+            try:
+                async with redis_service.get_redis() as redis:
+                    acquired = await redis.set(lock_key, token, nx=True, px=timeout_ms)
+                if not acquired:
+                    single_flight_calls_total.labels(self.name, "remote_waiter").inc()
+                    result = await self._wait_for_leader(lock_key, wait_for, timeout_ms)
+                    if result is not None:
+                        return result
+            except RedisError:
+                logger.warning("Single flight lock %s is not available, executing without it", lock_key, exc_info=True)
+
+            try:
+                return await fn()
+            finally:
+                if acquired:
+                    with suppress(RedisError):
+                        async with redis_service.get_redis() as redis:
+                            await redis.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+    @staticmethod
+    async def _wait_for_leader(lock_key: str, wait_for: Callable[[], Awaitable[T | None]], timeout_ms: int) -> T | None:
+        """
+        Result of the worker holding the lock.
+        None - it released the lock without result (nothing found, failed) or did not finish in time.
+        """
+        deadline = time.monotonic() + timeout_ms / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+            result = await wait_for()
+            if result is not None:
+                return result
+            async with redis_service.get_redis() as redis:
+                if not await redis.exists(lock_key):
+                    # fn fills the cache before the lock is released, so it is read once more
+                    return await wait_for()
+        return None
+
+
+_single_flights: dict[str, SingleFlight] = {}
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    if name not in _single_flights:
+        _single_flights[name] = SingleFlight(name)
+    return _single_flights[name]
@@ -16,12 +16,28 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str
     REFRESH_TOKEN_TIME_MINUTES: int = 60 * 24  # one day
     ACCESS_TOKEN_TIME_MINUTES: int = 60 * 5
+    # bcrypt is CPU bound, more threads than cores only make every login slower
+    PASSWORD_HASH_WORKERS: int = 2
 
     REDIS_PASSWORD: str
     REDIS_PORT: int
     REDIS_DATABASES: int
     REDIS_HOST: str
     REDIS_CACHE_PREFIX: str = "fastapi-cache"
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT_SECONDS: int = 5
+    REDIS_HEALTH_CHECK_INTERVAL_SECONDS: int = 30
+    USER_CACHE_TTL_SECONDS: int = 60
+    # other workers drop their in-process copy only by ttl, so it is kept short
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 5
+    CATALOG_CACHE_TTL_SECONDS: int = 60 * 5
+    # is dropped by pub/sub on every change, ttl is a safety net for lost messages
+    CATALOG_CACHE_LOCAL_TTL_SECONDS: int = 30
+    CATALOG_CACHE_LOCAL_SIZE: int = 5_000
+    LISTING_CACHE_TTL_SECONDS: int = 60
+    # concurrent identical reads of other workers wait for one query instead of running their own
+    SINGLE_FLIGHT_REDIS_LOCK: bool = True
+    SINGLE_FLIGHT_LOCK_TIMEOUT_MS: int = 1000
 
     S3_ACCESS_KEY: str
     S3_SECRET_KEY: str
@@ -48,11 +64,21 @@ class Settings(BaseSettings):
     RABBITMQ_DEFAULT_USER: str
     RABBITMQ_DEFAULT_PASS: str
     RABBITMQ_AMQP_PORT: int
+    # one robust connection per process, channels with publisher confirms
+    RABBITMQ_CHANNEL_POOL_SIZE: int = 2
+    # outbox relay polls the table when it was not woken up by a commit of the same worker
+    OUTBOX_RELAY_BATCH_SIZE: int = 100
+    OUTBOX_RELAY_INTERVAL_SECONDS: float = 1
+    OUTBOX_RETRY_MAX_DELAY_SECONDS: int = 300
 
     STRIPE_SECRET_KEY: str
 
     WORK_URL: str
     FLAGSMITH_API_KEY: str = ""
+    # flags are re-evaluated in background, request path never calls Flagsmith
+    FLAGSMITH_REFRESH_INTERVAL_SECONDS: int = 60
+    # path to saved environment document - offline mode for tests, API key is not used
+    FLAGSMITH_OFFLINE_FILE: str = ""
 
     @property
     def DATABASE_URL(self) -> str:
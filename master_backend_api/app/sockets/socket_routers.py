@@ -6,15 +6,17 @@ from sockets import socket_utils
 
 
 from sockets.socket_io import sio
-from sockets.socket_utils import get_user_from_data
+from sockets.socket_utils import USERS_KEY, get_user_from_data
 
 
 @sio.event
 async def connect(sid, environ):
-    await socket_utils.store_users_data(sid, user={"id": -1, "name": "-", "email": "-"})
+    async with redis_service.pipeline() as p:
+        socket_utils.store_users_data(p, sid, user={"id": -1, "name": "-", "email": "-"})
+        p.hgetall(USERS_KEY)
+        *_, users = await p.execute()
 
     print(f"Клиент подключился: {sid}")
-    users = await redis_service.hgetall("socketio:users")
 
     await sio.emit("users", {"Кол-во пользователей": len(users)})
     await sio.emit("users_list", {"users_list": users})
@@ -23,20 +25,21 @@ async def connect(sid, environ):
 
 @sio.event
 async def disconnect(sid):
-    await redis_service.hdel("socketio:users", sid)
-    await redis_service.delete_cache(sid)
+    async with redis_service.pipeline() as p:
+        p.hdel(USERS_KEY, sid)
+        p.delete(sid)
+        p.hgetall(USERS_KEY)
+        *_, users = await p.execute()
 
     print(f"Клиент отключился: {sid}")
 
-    users = await redis_service.hgetall("socketio:users")
-
     await sio.emit("users", {"Кол-во пользователей": len(users)})
     await sio.emit("users_list", {"users_list": users})
 
 
 @sio.event
 async def get_users(sid, data, *args):
-    users = await redis_service.hgetall("socketio:users")
+    users = await redis_service.hgetall(USERS_KEY)
     print(data, args)
 
     await sio.emit("users_list", {"users_list": users})
@@ -54,10 +57,12 @@ async def set_user(sid, data: dict | str, *args):
     if not user:
         return
 
-    await socket_utils.set_user_data(sid=sid, user=user)
-    await socket_utils.store_users_data(sid=sid, user=user)
-    await socket_utils.link_sid_with_user(sid=sid, user=user)
-    users = await redis_service.hgetall("socketio:users")
+    async with redis_service.pipeline() as p:
+        socket_utils.set_user_data(p, sid=sid, user=user)
+        socket_utils.store_users_data(p, sid=sid, user=user)
+        socket_utils.link_sid_with_user(p, sid=sid, user=user)
+        p.hgetall(USERS_KEY)
+        *_, users = await p.execute()
     await sio.emit("users_list", {"users_list": users})
 
 
@@ -65,11 +70,13 @@ async def set_user(sid, data: dict | str, *args):
 async def my_messages(sid, data, *args):
     user_id = await redis_service.get_cache(key=f"socketio:sid:{sid}")
     print(user_id, 66666666666666666666666666666)
-    sids = await redis_service.lrange(f"socketio:user:{user_id}")
+    async with redis_service.pipeline(transaction=False) as p:
+        p.lrange(f"socketio:user:{user_id}", 0, -1)
+        p.hgetall(USERS_KEY)
+        sids, users = await p.execute()
     await sio.emit(
         "my_messages", {"title": "new title", "time": str(datetime.now()), "message": "test message"}, to=sids
     )
-    users = await redis_service.hgetall("socketio:users")
     print(users, 88888888888888888888888)
     await sio.emit("users_list", {"users_list": users})
     return """callback as a response in socket.emit("my_messages", {}, (response) => {
@@ -1,13 +1,16 @@
 import json
 from typing import Union
 
+from redis.asyncio.client import Pipeline
+
 from applications.auth.auth_handler import AuthHandler
 from applications.users.crud import user_manager
 from dependencies.database import get_async_session_instance, get_async_session
 
 from applications.users.models import User
 
-from services.redis_service import redis_service
+USERS_KEY = "socketio:users"
+SOCKET_DATA_TTL = 60 * 60 * 24
 
 
 async def get_user_from_data(user_data: dict):
@@ -23,20 +26,24 @@ async def get_user_from_data(user_data: dict):
     return user
 
 
-async def store_users_data(sid: str, user: Union["User", dict]):
+# functions below only add commands to redis_service.pipeline(), it is sent by the caller in one round trip
+
+
+def store_users_data(pipe: Pipeline, sid: str, user: Union["User", dict]):
     if isinstance(user, dict):
         data = user
     else:
         data = {"id": user.id, "name": str(user.name), "email": str(user.email)}
-    key = "socketio:users"
-    await redis_service.hset(key=key, field=sid, value=json.dumps(data), ttl=60 * 60 * 24)
+    pipe.hset(USERS_KEY, sid, json.dumps(data))
+    pipe.expire(USERS_KEY, SOCKET_DATA_TTL)
 
 
-async def set_user_data(sid: str, user: "User"):
+def set_user_data(pipe: Pipeline, sid: str, user: "User"):
     key = f"socketio:user:{user.id}"
-    await redis_service.lpush(key=key, value=sid, ttl=60 * 60 * 24)
+    pipe.lpush(key, sid)
+    pipe.expire(key, SOCKET_DATA_TTL)
 
 
-async def link_sid_with_user(sid: str, user: "User"):
+def link_sid_with_user(pipe: Pipeline, sid: str, user: "User"):
     key = f"socketio:sid:{sid}"
-    await redis_service.set_cache(key=key, value=str(user.id))
+    pipe.set(key, str(user.id), ex=60)
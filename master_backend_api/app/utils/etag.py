@@ -0,0 +1,38 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+from settings import settings
+
+# clients always revalidate, unchanged data costs one 304 without body
+CACHE_CONTROL = "no-cache"
+
+
+def make_etag(*parts) -> str:
+    """
+    Strong ETag from version/updated_at values or from the body itself.
+    PROJECT_VERSION is mixed in - representation can change after deploy while the data stays the same.
+    """
+    raw = "|".join(str(part) for part in (settings.PROJECT_VERSION, *parts))
+    return f'"{hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match uses weak comparison, W/ prefix is ignored"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified_response(etag: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_etag(response, etag)
+    return response
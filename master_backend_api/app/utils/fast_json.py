@@ -0,0 +1,61 @@
+from functools import cache
+from typing import Any, get_args
+
+import orjson
+from pydantic import AliasChoices, BaseModel
+from pydantic_core import to_jsonable_python
+
+# pydantic writes UTC as Z, orjson as +00:00 by default
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _has_nested_model(annotation: Any) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_has_nested_model(arg) for arg in get_args(annotation))
+
+
+@cache
+def get_schema_attributes(schema: type[BaseModel]) -> tuple[tuple[str, str], ...]:
+    """(response key, ORM attribute the field is read from) for every field of the schema"""
+    schema_attributes = []
+    for name, field in schema.model_fields.items():
+        attribute = name
+        if isinstance(field.validation_alias, AliasChoices):
+            attribute = field.validation_alias.choices[0]
+        elif isinstance(field.validation_alias, str) and field.validation_alias != field.alias:
+            # alias from alias_generator (camelCase) is not an ORM attribute, populate_by_name reads the name
+            attribute = field.validation_alias
+        schema_attributes.append((field.serialization_alias or field.alias or name, attribute))
+    return tuple(schema_attributes)
+
+
+@cache
+def get_row_fields(schema: type[BaseModel]) -> tuple[tuple[str, str], ...] | None:
+    """
+    get_schema_attributes of the schema, if its rows can be dumped without pydantic.
+    None - schema changes values itself (validators, serializers, nested models), rows must go through pydantic.
+    """
+    decorators = schema.__pydantic_decorators__
+    if any((decorators.validators, decorators.field_validators, decorators.root_validators)):
+        return None
+    if any((decorators.field_serializers, decorators.model_serializers, decorators.model_validators)):
+        return None
+    if schema.model_computed_fields:
+        return None
+    if any(_has_nested_model(field.annotation) for field in schema.model_fields.values()):
+        return None
+    return get_schema_attributes(schema)
+
+
+def dump_page(schema: type[BaseModel], items: list, page_info: dict) -> bytes:
+    """
+    Listing page as response JSON (by_alias, as response_model gives it).
+    Rows are written to be valid, so values of plain schemas are dumped by orjson without per-row pydantic models.
+    """
+    row_fields = get_row_fields(schema)
+    if row_fields is None:
+        rows = [schema.model_validate(item).model_dump(mode="json", by_alias=True) for item in items]
+    else:
+        rows = [{key: getattr(item, attribute) for key, attribute in row_fields} for item in items]
+    return orjson.dumps({"items": rows, **page_info}, default=to_jsonable_python, option=ORJSON_OPTIONS)
@@ -0,0 +1,15 @@
+from fastapi import Response
+
+from utils.etag import set_etag
+
+
+def json_response(content: str | bytes, etag: str | None = None) -> Response:
+    """
+    Ready JSON body (pydantic model_dump_json or cached one) is returned as is.
+    FastAPI skips response_model validation and json.dumps for Response, OpenAPI still uses the return annotation.
+    Headers set on the injected Response are not copied - etag is set here.
+    """
+    response = Response(content=content, media_type="application/json")
+    if etag:
+        set_etag(response, etag)
+    return response
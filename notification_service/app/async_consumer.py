@@ -0,0 +1,117 @@
+import asyncio
+import json
+import logging
+import signal
+from typing import Awaitable, Callable
+
+import aio_pika
+from aio_pika.abc import AbstractIncomingMessage, AbstractQueue
+
+from constants import SupportedQueues
+from settings import settings
+from utils.email_sender import precompile_templates, shutdown_render_pool
+from utils.smtp_pool import smtp_pool
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+log = logging.getLogger(__name__)
+
+
+class QueueConsumer:
+    """
+    Consumer of one queue on its own channel.
+    prefetch_count - unacked messages the broker gives to this consumer,
+    concurrency - handlers running at the same time, the rest of prefetched messages wait.
+    """
+
+    def __init__(
+        self,
+        queue: AbstractQueue,
+        handler: Callable[[dict], Awaitable[None]],
+        concurrency: int,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: set[asyncio.Task] = set()
+        self._consumer_tag: str | None = None
+
+    async def start(self) -> None:
+        self._consumer_tag = await self.queue.consume(self.on_message)
+        log.info("Listening to queue: %s", self.queue.name)
+
+    async def on_message(self, message: AbstractIncomingMessage) -> None:
+        task = asyncio.create_task(self._process(message))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, message: AbstractIncomingMessage) -> None:
+        try:
+            body = json.loads(message.body.decode("utf-8"))
+        except ValueError:
+            # redelivery gives the same body - invalid message is dropped
+            log.error("Invalid message in '%s': %r", self.queue.name, message.body)
+            await message.ack()
+            return
+
+        async with self._semaphore:
+            try:
+                await self.handler(body)
+            except Exception:
+                # one more attempt, then the message is dropped
+                log.exception("Message from '%s' failed", self.queue.name)
+                await message.reject(requeue=not message.redelivered)
+            else:
+                await message.ack()
+
+    async def stop(self, timeout: float) -> None:
+        """no new deliveries, handlers in progress are finished (unacked rest is requeued)"""
+        if self._consumer_tag:
+            await self.queue.cancel(self._consumer_tag)
+            self._consumer_tag = None
+        if self._tasks:
+            log.info(
+                "Queue '%s': waiting for %s handlers", self.queue.name, len(self._tasks)
+            )
+            await asyncio.wait(self._tasks, timeout=timeout)
+
+
+async def consume_messages_async() -> None:
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    precompile_templates(SupportedQueues.get_queues())
+
+    connection = await aio_pika.connect_robust(settings.RABBITMQ_URL)
+    async with connection:
+        consumers = []
+        for queue_name in SupportedQueues.get_queues():
+            handler = SupportedQueues.get_handler(queue_name)
+            if not handler:
+                continue
+            channel = await connection.channel()
+            await channel.set_qos(prefetch_count=settings.CONSUMER_PREFETCH_COUNT)
+            queue = await channel.declare_queue(queue_name, durable=True)
+            log.info("Queue '%s' ensured.", queue_name)
+            consumer = QueueConsumer(
+                queue, handler, concurrency=settings.CONSUMER_CONCURRENCY
+            )
+            await consumer.start()
+            consumers.append(consumer)
+
+        log.info("Waiting for messages...")
+        await stop_event.wait()
+
+        log.info("Shutting down, draining handlers...")
+        await asyncio.gather(
+            *(
+                consumer.stop(timeout=settings.CONSUMER_SHUTDOWN_TIMEOUT_SECONDS)
+                for consumer in consumers
+            )
+        )
+    await smtp_pool.close()
+    shutdown_render_pool()
@@ -0,0 +1,93 @@
+"""
+Emails per second sent to the local SMTP sink (benchmarks/smtp_sink.py):
+
+    smtplib per email - previous send_email: connect + login + send + quit in a thread for every email
+    pooled aiosmtplib - utils/smtp_pool.py: logged in connections are reused
+
+Sink is local and without TLS, so handshake is cheaper than with a real server
+and the difference in production is bigger.
+
+Run inside notification-service container:
+    python -m benchmarks.email_throughput --emails 500 --concurrency 10
+"""
+
+import argparse
+import asyncio
+import smtplib
+import time
+
+from benchmarks.smtp_sink import start_sink
+from settings import settings
+from utils.email_sender import build_message
+from utils.smtp_pool import SMTPPool
+
+RECIPIENTS = ["user@example.com"]
+
+
+def make_message():
+    return build_message(
+        RECIPIENTS, mail_body="<p>benchmark</p>" * 50, mail_subject="benchmark"
+    )
+
+
+def send_with_smtplib(hostname: str, port: int) -> None:
+    mail = smtplib.SMTP(hostname, port)
+    mail.login(settings.SMTP_USER, settings.SMTP_TOKEN)
+    mail.sendmail(settings.SMTP_USER, RECIPIENTS, make_message().as_string())
+    mail.quit()
+
+
+async def smtplib_per_email(emails: int, concurrency: int) -> None:
+    hostname, port = SMTPPool.get_address()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send():
+        async with semaphore:
+            await asyncio.to_thread(send_with_smtplib, hostname, port)
+
+    await asyncio.gather(*(send() for _ in range(emails)))
+
+
+async def pooled_aiosmtplib(emails: int, concurrency: int) -> None:
+    pool = SMTPPool(size=concurrency)
+
+    async def send():
+        await pool.send(
+            make_message(), sender=settings.SMTP_USER, recipients=RECIPIENTS
+        )
+
+    await asyncio.gather(*(send() for _ in range(emails)))
+    await pool.close()
+
+
+async def main_benchmark(emails: int, concurrency: int, port: int) -> None:
+    controller = start_sink(port=port)
+    settings.SMTP_SERVER = f"{controller.hostname}:{controller.port}"
+    settings.SMTP_USE_TLS = False
+    try:
+        print(f"{'path':<20}{'emails':>8}{'seconds':>10}{'emails/s':>10}")
+        for path, fn in (
+            ("smtplib per email", smtplib_per_email),
+            ("pooled aiosmtplib", pooled_aiosmtplib),
+        ):
+            received = controller.handler.received
+            start = time.perf_counter()
+            await fn(emails, concurrency)
+            elapsed = time.perf_counter() - start
+            assert controller.handler.received - received == emails, path
+            print(f"{path:<20}{emails:>8}{elapsed:>10.2f}{emails / elapsed:>10.1f}")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument(
+        "--concurrency", type=int, default=10, help="CONSUMER_CONCURRENCY"
+    )
+    parser.add_argument("--port", type=int, default=1025, help="sink port")
+    args = parser.parse_args()
+    asyncio.run(main_benchmark(args.emails, args.concurrency, args.port))
@@ -0,0 +1,65 @@
+"""
+Local SMTP stand-in: accepts any login and any email, counts and drops them.
+
+Run it and point the service to it:
+    python -m benchmarks.smtp_sink --port 1025
+    SMTP_SERVER=localhost:1025 SMTP_USE_TLS=false python main.py
+"""
+
+import argparse
+import logging
+import time
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+log = logging.getLogger(__name__)
+
+# aiosmtpd logs this about its own legacy attribute on every successful AUTH
+logging.getLogger("mail.log").addFilter(
+    lambda record: "login_data is deprecated" not in record.getMessage()
+)
+
+
+class SinkHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope) -> str:
+        self.received += 1
+        log.debug("Email to %s dropped", envelope.rcpt_tos)
+        return "250 Message accepted for delivery"
+
+
+def accept_any_login(server, session, envelope, mechanism, auth_data) -> AuthResult:
+    return AuthResult(success=True)
+
+
+def start_sink(hostname: str = "127.0.0.1", port: int = 1025) -> Controller:
+    """sink in a background thread, controller.handler.received - emails got"""
+    controller = Controller(
+        SinkHandler(),
+        hostname=hostname,
+        port=port,
+        authenticator=accept_any_login,
+        auth_require_tls=False,
+    )
+    controller.start()
+    return controller
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hostname", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    controller = start_sink(args.hostname, args.port)
+    log.info("SMTP sink is listening on %s:%s", args.hostname, args.port)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        controller.stop()
+    log.info("Emails received: %s", controller.handler.received)
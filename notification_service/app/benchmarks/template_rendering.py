@@ -0,0 +1,88 @@
+"""
+Renders per second of email templates:
+
+    environment per email - previous create_body_letter: new Environment, template parsed and compiled every time
+    cached environment    - utils/email_sender.py template_env, templates precompiled at start
+    worker pool           - render_body_letter with the template in TEMPLATES_RENDER_IN_POOL
+
+SMTP and RabbitMQ are not needed.
+
+Run inside notification-service container:
+    python -m benchmarks.template_rendering --renders 2000 --workers 4
+"""
+
+import argparse
+import asyncio
+import time
+
+import jinja2
+
+from constants import SupportedQueues
+from settings import settings
+from utils.email_sender import (
+    TEMPLATES_DIR,
+    create_body_letter,
+    precompile_templates,
+    render_body_letter,
+    shutdown_render_pool,
+)
+
+TEMPLATE_NAME = "user_registration"
+PARAMS = {"email": "user@example.com", "token": "x" * 64, "lang": "uk"}
+
+
+def render_with_new_environment(lang: str, template_name: str, params: dict) -> str:
+    template_env = jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATES_DIR))
+    return template_env.get_template(f"{lang}/{template_name}.html").render(params)
+
+
+async def environment_per_email(renders: int) -> None:
+    for _ in range(renders):
+        render_with_new_environment("uk", TEMPLATE_NAME, PARAMS)
+
+
+async def cached_environment(renders: int) -> None:
+    for _ in range(renders):
+        create_body_letter("uk", TEMPLATE_NAME, PARAMS)
+
+
+async def worker_pool(renders: int) -> None:
+    await asyncio.gather(
+        *(render_body_letter("uk", TEMPLATE_NAME, PARAMS) for _ in range(renders))
+    )
+
+
+async def main_benchmark(renders: int, workers: int) -> None:
+    precompile_templates(SupportedQueues.get_queues())
+    assert render_with_new_environment(
+        "uk", TEMPLATE_NAME, PARAMS
+    ) == create_body_letter("uk", TEMPLATE_NAME, PARAMS)
+
+    settings.TEMPLATES_RENDER_POOL_SIZE = workers
+    settings.TEMPLATES_RENDER_IN_POOL = {TEMPLATE_NAME}
+    # workers are started before measuring
+    await worker_pool(workers)
+
+    print(f"{'path':<24}{'renders':>8}{'seconds':>10}{'renders/s':>12}")
+    try:
+        for path, fn in (
+            ("environment per email", environment_per_email),
+            ("cached environment", cached_environment),
+            ("worker pool", worker_pool),
+        ):
+            start = time.perf_counter()
+            await fn(renders)
+            elapsed = time.perf_counter() - start
+            print(f"{path:<24}{renders:>8}{elapsed:>10.3f}{renders / elapsed:>12.0f}")
+    finally:
+        shutdown_render_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--renders", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4, help="worker processes")
+    args = parser.parse_args()
+    asyncio.run(main_benchmark(args.renders, args.workers))
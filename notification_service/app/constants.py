@@ -1,5 +1,5 @@
 from enum import StrEnum
-from typing import Callable, Union
+from typing import Awaitable, Callable, Union
 
 from handlers import (
     process_new_user_registration,
@@ -18,10 +18,18 @@ class SupportedQueues(StrEnum):
         return list(cls)
 
     @classmethod
-    def get_handler(cls, queue_name: str) -> Union[Callable, None]:
+    def get_handler(
+        cls, queue_name: str
+    ) -> Union[Callable[[dict], Awaitable[None]], None]:
+        """handler gets decoded message body, message is acked by consumer"""
         handlers = {
             cls.USER_REGISTRATION.value: process_new_user_registration,
             cls.USER_RECOVERY_PASSWORD.value: process_user_recovery_password,
             cls.SMS_SENDING.value: process_new_sms_sending,
         }
         return handlers.get(queue_name)
+
+
+class ConsumerModeEnum(StrEnum):
+    ASYNCIO = "asyncio"
+    BLOCKING = "blocking"
@@ -1,10 +1,14 @@
-from typing import TYPE_CHECKING
+import asyncio
+import json
+from typing import TYPE_CHECKING, Awaitable, Callable
 
 from constants import SupportedQueues
+from utils.email_sender import precompile_templates
 import logging
 
 if TYPE_CHECKING:
     from pika.adapters.blocking_connection import BlockingChannel
+    from pika.spec import Basic, BasicProperties
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -19,16 +23,36 @@ def setup_queues(channel: "BlockingChannel", queues: list) -> None:
         log.info("Queue '%s' ensured.", queue)
 
 
+def make_callback(
+    handler: Callable[[dict], Awaitable[None]], loop: asyncio.AbstractEventLoop
+) -> Callable:
+    """async handler is run to completion - one message at a time"""
+
+    def on_message(
+        ch: "BlockingChannel",
+        method: "Basic.Deliver",
+        properties: "BasicProperties",
+        body: bytes,
+    ):
+        loop.run_until_complete(handler(json.loads(body.decode("utf-8"))))
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+
+    return on_message
+
+
 def consume_messages(channel: "BlockingChannel") -> None:
+    """CONSUMER_MODE=blocking, see async_consumer.py for the default mode"""
     queues = SupportedQueues.get_queues()
     setup_queues(channel, queues)
+    precompile_templates(queues)
+    loop = asyncio.new_event_loop()
 
     for queue in queues:
         handler = SupportedQueues.get_handler(queue)
         if handler:
             channel.basic_consume(
                 queue=queue,
-                on_message_callback=handler,
+                on_message_callback=make_callback(handler, loop),
             )
             log.info("Listening to queue: %s", queue)
 
@@ -1,77 +1,42 @@
-import json
 import logging
-from typing import TYPE_CHECKING
 
-from utils.email_sender import send_email, create_body_letter
-
-if TYPE_CHECKING:
-    from pika.adapters.blocking_connection import BlockingChannel
-    from pika.spec import Basic, BasicProperties
+from utils.email_sender import send_email, render_body_letter
 
 log = logging.getLogger(__name__)
 
 
-def process_new_user_registration(
-    ch: "BlockingChannel",
-    method: "Basic.Deliver",
-    properties: "BasicProperties",
-    body: bytes,
-):
-    log.info("ch: %s", ch)
-    log.info("method: %s", method)
-    log.info("properties: %s", properties)
+async def process_new_user_registration(body: dict) -> None:
     log.info("body: %s", body)
 
-    body_dict = json.loads(body.decode("utf-8"))
-    if not (email := body_dict.get("email")):
-        log.error(f"No email provided, {body_dict=}")
+    if not (email := body.get("email")):
+        log.error(f"No email provided, {body=}")
         return
 
-    body = create_body_letter(
-        lang=body_dict.get("lang", "uk"),
+    mail_body = await render_body_letter(
+        lang=body.get("lang", "uk"),
         template_name="user_registration",
-        params=body_dict,
+        params=body,
     )
-    send_email([email], mail_body=body, mail_subject="user_register")
-    ch.basic_ack(delivery_tag=method.delivery_tag)
+    await send_email([email], mail_body=mail_body, mail_subject="user_register")
 
 
-def process_user_recovery_password(
-    ch: "BlockingChannel",
-    method: "Basic.Deliver",
-    properties: "BasicProperties",
-    body: bytes,
-):
-    log.info("ch: %s", ch)
-    log.info("method: %s", method)
-    log.info("properties: %s", properties)
+async def process_user_recovery_password(body: dict) -> None:
     log.info("body: %s", body)
 
-    body_dict = json.loads(body.decode("utf-8"))
-    if not (email := body_dict.get("email")):
-        log.error(f"No email provided, {body_dict=}")
+    if not (email := body.get("email")):
+        log.error(f"No email provided, {body=}")
         return
 
-    if not (token := body_dict.get("token")):
-        log.error(f"No token provided, {body_dict=}")
+    if not body.get("token"):
+        log.error(f"No token provided, {body=}")
         return
-    body = create_body_letter(
-        lang=body_dict.get("lang", "uk"),
+    mail_body = await render_body_letter(
+        lang=body.get("lang", "uk"),
         template_name="user_recovery_password",
-        params=body_dict,
+        params=body,
     )
-    send_email([email], mail_body=body, mail_subject="user_register")
-    ch.basic_ack(delivery_tag=method.delivery_tag)
+    await send_email([email], mail_body=mail_body, mail_subject="user_register")
 
 
-def process_new_sms_sending(
-    ch: "BlockingChannel",
-    method: "Basic.Deliver",
-    properties: "BasicProperties",
-    body: bytes,
-):
-    log.info("ch: %s", ch)
-    log.info("method: %s", method)
-    log.info("properties: %s", properties)
+async def process_new_sms_sending(body: dict) -> None:
     log.info("body: %s", body)
-    ch.basic_ack(delivery_tag=method.delivery_tag)
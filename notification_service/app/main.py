@@ -1,11 +1,22 @@
+import asyncio
+
 from connection_config import get_connection
-from consumer import consume_messages
+from constants import ConsumerModeEnum
+from settings import settings
 
 
 def main():
-    with get_connection() as connection:
-        with connection.channel() as channel:
-            consume_messages(channel=channel)
+    if settings.CONSUMER_MODE == ConsumerModeEnum.BLOCKING:
+        from consumer import consume_messages
+
+        with get_connection() as connection:
+            with connection.channel() as channel:
+                consume_messages(channel=channel)
+        return
+
+    from async_consumer import consume_messages_async
+
+    asyncio.run(consume_messages_async())
 
 
 if __name__ == "__main__":
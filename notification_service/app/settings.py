@@ -8,6 +8,25 @@ class Settings(BaseSettings):
     SMTP_TOKEN: str
     SMTP_USER: str
     SMTP_SERVER: str
+    # port if SMTP_SERVER has none, 465 - implicit TLS (SMTP_SSL)
+    SMTP_PORT: int = 465
+    SMTP_USE_TLS: bool = True
+    SMTP_TIMEOUT_SECONDS: float = 30
+    # authenticated connections kept open, also max emails sent at the same time
+    SMTP_POOL_SIZE: int = 5
+    # servers limit emails per session, connection is reopened after it
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    # idle connection is reopened before the server drops it
+    SMTP_IDLE_TIMEOUT_SECONDS: float = 60
+
+    # jinja bytecode cache, empty - system temp dir
+    TEMPLATES_BYTECODE_CACHE_DIR: str = ""
+    # templates are checked for changes on every render, for development
+    TEMPLATES_AUTO_RELOAD: bool = False
+    # worker processes for heavy templates, 0 - all templates are rendered in the loop
+    TEMPLATES_RENDER_POOL_SIZE: int = 0
+    # template names rendered in the worker processes, e.g. '["user_registration"]'
+    TEMPLATES_RENDER_IN_POOL: set[str] = set()
 
     RABBITMQ_HOSTNAME: str
     RABBITMQ_CONTAINER_NAME: str
@@ -15,6 +34,15 @@ class Settings(BaseSettings):
     RABBITMQ_DEFAULT_PASS: str
     RABBITMQ_AMQP_PORT: int
 
+    # asyncio - aio-pika consumer (async_consumer.py), blocking - pika, one message at a time
+    CONSUMER_MODE: str = "asyncio"
+    # unacked messages per queue given by the broker
+    CONSUMER_PREFETCH_COUNT: int = 20
+    # handlers running at the same time per queue
+    CONSUMER_CONCURRENCY: int = 10
+    # on SIGTERM running handlers are awaited up to timeout
+    CONSUMER_SHUTDOWN_TIMEOUT_SECONDS: float = 30
+
     @property
     def RABBITMQ_URL(self) -> str:
         return (
@@ -1,5 +1,7 @@
+import asyncio
+import logging
 import os
-import smtplib
+from concurrent.futures import ProcessPoolExecutor
 from email import encoders
 from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
@@ -8,19 +10,34 @@ from email.mime.text import MIMEText
 import jinja2
 
 from settings import settings
+from utils.smtp_pool import smtp_pool
 
+log = logging.getLogger(__name__)
 
-def send_email(
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+
+# compiled templates are kept by the environment, bytecode cache shares them between
+# processes and restarts, templates are not checked for changes on every render
+template_env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(TEMPLATES_DIR),
+    bytecode_cache=jinja2.FileSystemBytecodeCache(
+        settings.TEMPLATES_BYTECODE_CACHE_DIR or None
+    ),
+    auto_reload=settings.TEMPLATES_AUTO_RELOAD,
+)
+
+_render_pool: ProcessPoolExecutor | None = None
+
+
+def build_message(
     recipients: list[str],
     /,
     *,
     mail_body: str,
     mail_subject: str,
     attachment: str = None,
-):
-    TOKEN = settings.SMTP_TOKEN
+) -> MIMEMultipart:
     USER = settings.SMTP_USER
-    SMTP_SERVER = settings.SMTP_SERVER
 
     msg = MIMEMultipart("alternative")
     msg["Subject"] = mail_subject
@@ -48,16 +65,67 @@ def send_email(
             encoders.encode_base64(file)
             msg.attach(file)
 
-    mail = smtplib.SMTP_SSL(SMTP_SERVER)
-    mail.login(USER, TOKEN)
-    mail.sendmail(USER, recipients, msg.as_string())
-    mail.quit()
+    return msg
+
+
+async def send_email(
+    recipients: list[str],
+    /,
+    *,
+    mail_body: str,
+    mail_subject: str,
+    attachment: str = None,
+):
+    """sent over pooled authenticated connection, see utils/smtp_pool.py"""
+    msg = build_message(
+        recipients,
+        mail_body=mail_body,
+        mail_subject=mail_subject,
+        attachment=attachment,
+    )
+    await smtp_pool.send(msg, sender=settings.SMTP_USER, recipients=recipients)
 
 
 def create_body_letter(lang: str, template_name: str, params: dict) -> str:
-    template_loader = jinja2.FileSystemLoader(searchpath="./")
-    template_env = jinja2.Environment(loader=template_loader)
-    template_file = f"templates/{lang}/{template_name}.html"
-    template = template_env.get_template(template_file)
-    output = template.render(params)
-    return output
+    template = template_env.get_template(f"{lang}/{template_name}.html")
+    return template.render(params)
+
+
+async def render_body_letter(lang: str, template_name: str, params: dict) -> str:
+    """templates from TEMPLATES_RENDER_IN_POOL are rendered in worker processes"""
+    if (
+        settings.TEMPLATES_RENDER_POOL_SIZE
+        and template_name in settings.TEMPLATES_RENDER_IN_POOL
+    ):
+        global _render_pool
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=settings.TEMPLATES_RENDER_POOL_SIZE
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _render_pool, create_body_letter, lang, template_name, params
+        )
+    return create_body_letter(lang, template_name, params)
+
+
+def precompile_templates(template_names: list[str]) -> int:
+    """
+    Loads templates of all languages for template_names at consumer start,
+    the first email does not wait for parsing. Returns number of templates loaded.
+    """
+    names = {f"{name}.html" for name in template_names}
+    loaded = 0
+    for template_file in template_env.list_templates(extensions=["html"]):
+        if os.path.basename(template_file) in names:
+            template_env.get_template(template_file)
+            loaded += 1
+    log.info("Email templates precompiled: %s", loaded)
+    return loaded
+
+
+def shutdown_render_pool() -> None:
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown()
+        _render_pool = None
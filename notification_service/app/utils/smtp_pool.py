@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from email.message import Message
+
+import aiosmtplib
+
+from settings import settings
+
+log = logging.getLogger(__name__)
+
+# connection is broken, email can be sent again on a new one
+RECONNECT_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+)
+
+
+class PooledSMTP:
+    """authenticated connection and how much it was used"""
+
+    def __init__(self, client: aiosmtplib.SMTP):
+        self.client = client
+        self.sent = 0
+        self.released_at = time.monotonic()
+
+
+class SMTPPool:
+    """
+    Up to SMTP_POOL_SIZE authenticated SMTP sessions shared by all handlers.
+    Connect + TLS + AUTH is done once per connection, then it sends emails one after another.
+    Connection is replaced after SMTP_MAX_MESSAGES_PER_CONNECTION emails or SMTP_IDLE_TIMEOUT_SECONDS idle
+    (before the server closes it), broken connection is replaced and the email is sent once more.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle: list[PooledSMTP] = []
+
+    @staticmethod
+    def get_address() -> tuple[str, int]:
+        # SMTP_SERVER may be "host:port", as smtplib accepted it
+        hostname, _, port = settings.SMTP_SERVER.partition(":")
+        return hostname, int(port) if port else settings.SMTP_PORT
+
+    async def _connect(self) -> PooledSMTP:
+        hostname, port = self.get_address()
+        client = aiosmtplib.SMTP(
+            hostname=hostname,
+            port=port,
+            use_tls=settings.SMTP_USE_TLS,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+        )
+        await client.connect()
+        await client.login(settings.SMTP_USER, settings.SMTP_TOKEN)
+        return PooledSMTP(client)
+
+    @staticmethod
+    async def _disconnect(connection: PooledSMTP) -> None:
+        try:
+            await connection.client.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            connection.client.close()
+
+    async def _acquire(self) -> PooledSMTP:
+        while self._idle:
+            # last released is the most likely to be alive
+            connection = self._idle.pop()
+            idle_for = time.monotonic() - connection.released_at
+            if connection.client.is_connected and (
+                idle_for < settings.SMTP_IDLE_TIMEOUT_SECONDS
+            ):
+                return connection
+            await self._disconnect(connection)
+        return await self._connect()
+
+    async def _release(self, connection: PooledSMTP) -> None:
+        if connection.sent >= settings.SMTP_MAX_MESSAGES_PER_CONNECTION:
+            await self._disconnect(connection)
+            return
+        connection.released_at = time.monotonic()
+        self._idle.append(connection)
+
+    async def send(
+        self, message: Message, /, *, sender: str, recipients: list[str]
+    ) -> None:
+        async with self._semaphore:
+            for attempt in (1, 2):
+                connection = await self._acquire()
+                try:
+                    await connection.client.send_message(
+                        message, sender=sender, recipients=recipients
+                    )
+                except RECONNECT_ERRORS:
+                    connection.client.close()
+                    if attempt == 2:
+                        raise
+                    log.warning("SMTP connection was lost, reconnecting")
+                    continue
+                except Exception:
+                    # refused recipient etc. - the session itself is still valid
+                    connection.sent += 1
+                    await self._release(connection)
+                    raise
+                connection.sent += 1
+                await self._release(connection)
+                return
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self._disconnect(connection) for connection in idle))
+
+
+smtp_pool = SMTPPool(size=settings.SMTP_POOL_SIZE)
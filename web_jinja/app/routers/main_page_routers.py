@@ -33,7 +33,14 @@ async def index(
 ):
 
     products_data = await call_main_api(
-        URLS.PRODUCTS, params={"limit": 8, "page": page, "q": query}
+        URLS.PRODUCTS,
+        params={
+            "limit": 8,
+            "page": page,
+            "q": query,
+            "total_mode": "window",
+            "search_engine": "fulltext",
+        },
     )
 
     context = {
@@ -233,6 +240,8 @@ async def add_product_to_cart(
             "limit": 8,
             "page": query_params.get("page") or 1,
             "q": query_params.get("query") or "",
+            "total_mode": "window",
+            "search_engine": "fulltext",
         },
     )
 
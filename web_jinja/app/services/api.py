@@ -1,26 +1,58 @@
+import hashlib
+from collections import OrderedDict
+
 import httpx
 
 from services.api_constants import URLS, ModeChangeOrderProductQuantityEnum
 from settings import settings
 
+# ETag of GET responses and parsed bodies: unchanged data is revalidated by 304
+# without transferring and parsing it again (bodies are shared - read only)
+_validators: OrderedDict[str, tuple[str, dict]] = OrderedDict()
+VALIDATORS_MAX_SIZE = 1000
+
+
+def _validator_key(url: str, params: dict, access_token: str) -> str:
+    # cart differs per user, token itself is not kept in memory
+    token_hash = (
+        hashlib.sha256(access_token.encode()).hexdigest() if access_token else ""
+    )
+    return f"{url}?{sorted((k, str(v)) for k, v in params.items())}#{token_hash}"
+
+
+def _remember_validator(key: str, etag: str, data: dict) -> None:
+    _validators[key] = (etag, data)
+    _validators.move_to_end(key)
+    while len(_validators) > VALIDATORS_MAX_SIZE:
+        _validators.popitem(last=False)
+
 
 async def call_main_api(
     endpoint: URLS, params: dict, path_id="", access_token=""
 ) -> dict:
 
     async with httpx.AsyncClient() as client:
+        url = f"{settings.BASE_URL}/api/{endpoint}/{path_id}"
         headers = {}
         if access_token:
             headers["Authorization"] = f"Bearer {access_token}"
+
+        key = _validator_key(url, params, access_token)
+        stored = _validators.get(key)
+        if stored:
+            headers["If-None-Match"] = stored[0]
         try:
-            response = await client.get(
-                f"{settings.BASE_URL}/api/{endpoint}/{path_id}",
-                params=params,
-                headers=headers,
-            )
+            response = await client.get(url, params=params, headers=headers)
             print(response.status_code)
+            if response.status_code == httpx.codes.NOT_MODIFIED and stored:
+                _validators.move_to_end(key)
+                return stored[1]
+
             response.raise_for_status()
-            return response.json()
+            data = response.json()
+            if etag := response.headers.get("etag"):
+                _remember_validator(key, etag, data)
+            return data
         except httpx.HTTPStatusError as e:
             print(f"HTTP error: {e.response.status_code} - {e.response.text}")
         except httpx.RequestError as e: